@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from helpers.cache import LRUCache
+from .models import Employee
+
+CustomUser = get_user_model()
+
+# The password hash is left out of the snapshots, it is loaded on access as a deferred field.
+SNAPSHOT_EXCLUDED_FIELDS = ("password",)
+
+local_user_cache = LRUCache(
+    max_size=getattr(settings, "JWT_USER_CACHE_MAX_SIZE", 1024),
+    timeout=getattr(settings, "JWT_USER_CACHE_TIMEOUT", 60),
+)
+
+
+def get_user_cache_key(user_id):
+    return f"jwt_user:{user_id}"
+
+
+def get_shared_user_cache():
+    """Return the JWT_USER_CACHE_ALIAS cache shared by the processes or None."""
+
+    alias = getattr(settings, "JWT_USER_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def get_instance_values(instance, excluded_fields=()):
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in excluded_fields
+    }
+
+
+def make_user_snapshot(user):
+    """Return the user, employee and groups values of an authenticated user."""
+
+    try:
+        employee = get_instance_values(user.employee)
+    except Employee.DoesNotExist:
+        employee = None
+    return {
+        "user": get_instance_values(user, SNAPSHOT_EXCLUDED_FIELDS),
+        "employee": employee,
+        "groups": [(group.pk, group.name) for group in user.groups.all()],
+    }
+
+
+def load_user_snapshot(snapshot):
+    """Return the user of the snapshot with its employee and groups loaded, without any query."""
+
+    db = router.db_for_read(CustomUser)
+    user_values = snapshot["user"]
+    user = CustomUser.from_db(db, list(user_values), list(user_values.values()))
+
+    employee = None
+    if snapshot["employee"] is not None:
+        employee_values = snapshot["employee"]
+        employee = Employee.from_db(db, list(employee_values), list(employee_values.values()))
+        Employee.user.field.set_cached_value(employee, user)
+    CustomUser.employee.related.set_cached_value(user, employee)
+
+    groups = user.groups.all()
+    groups._result_cache = [Group(pk=pk, name=name) for pk, name in snapshot["groups"]]
+    groups._prefetch_done = True
+    user._prefetched_objects_cache = {"groups": groups}
+    return user
+
+
+def invalidate_cached_user(user_id):
+    key = get_user_cache_key(user_id)
+    local_user_cache.delete(key)
+    shared_cache = get_shared_user_cache()
+    if shared_cache is not None:
+        shared_cache.delete(key)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication caching a snapshot of the token user with its employee and groups,
+    first in a local LRU cache (JWT_USER_CACHE_MAX_SIZE entries for JWT_USER_CACHE_TIMEOUT seconds)
+    and then in the JWT_USER_CACHE_ALIAS cache when set.
+    The snapshots are invalidated by the CustomUser and Employee signals (see accounts.signals).
+    A process only sees the invalidations made by another one through the shared cache
+    once its local entry has expired.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = get_user_cache_key(user_id)
+        snapshot = local_user_cache.get(key)
+        if snapshot is None:
+            shared_cache = get_shared_user_cache()
+            if shared_cache is not None:
+                snapshot = shared_cache.get(key)
+            if snapshot is None:
+                snapshot = self.get_user_snapshot(user_id)
+                if shared_cache is not None:
+                    shared_cache.set(
+                        key, snapshot, timeout=getattr(settings, "JWT_USER_CACHE_TIMEOUT", 60)
+                    )
+            local_user_cache.set(key, snapshot)
+
+        user = load_user_snapshot(snapshot)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    def get_user_snapshot(self, user_id):
+        try:
+            user = (
+                self.user_model.objects.select_related("employee")
+                .prefetch_related("groups")
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return make_user_snapshot(user)
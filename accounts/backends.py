@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+
+from helpers.cache import LRUCache, get_generations
+
+CustomUser = get_user_model()
+
+GROUP_PERMISSIONS_TABLE = Group.permissions.through._meta.db_table
+USER_PERMISSIONS_TABLE = CustomUser.user_permissions.through._meta.db_table
+
+groups_permissions = {"generation": None, "loaded_at": None, "permissions": {}}
+groups_permissions_lock = threading.Lock()
+users_permissions = LRUCache(
+    max_size=1024, timeout=getattr(settings, "PERMISSIONS_CACHE_TIMEOUT", 5)
+)
+
+
+def get_groups_permissions():
+    """
+    Return the permissions set of every group, loaded in one query and kept by the process
+    until a change of a group permissions bumps the generation of their table (see accounts.signals)
+    or for PERMISSIONS_CACHE_TIMEOUT seconds at most.
+    """
+
+    generation = get_generations(GROUP_PERMISSIONS_TABLE)
+    with groups_permissions_lock:
+        if (
+            groups_permissions["generation"] != generation
+            or time.monotonic() - groups_permissions["loaded_at"]
+            >= getattr(settings, "PERMISSIONS_CACHE_TIMEOUT", 5)
+        ):
+            permissions = defaultdict(set)
+            for group_id, app_label, codename in Permission.objects.filter(
+                group__isnull=False
+            ).values_list("group", "content_type__app_label", "codename"):
+                permissions[group_id].add(f"{app_label}.{codename}")
+            groups_permissions["permissions"] = {
+                group_id: frozenset(group_permissions)
+                for group_id, group_permissions in permissions.items()
+            }
+            groups_permissions["generation"] = generation
+            groups_permissions["loaded_at"] = time.monotonic()
+        return groups_permissions["permissions"]
+
+
+class CachedPermissionsBackend(ModelBackend):
+    """
+    ModelBackend reading the group permissions from the process-wide groups permissions sets
+    and the user permissions from a process LRU cache, both versioned by the generation
+    of their table, so that has_perm is a set lookup once the user groups are loaded
+    (prefetched by accounts.authentication.CachedJWTAuthentication).
+    """
+
+    def get_user_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if user_obj.is_superuser:
+            return super().get_user_permissions(user_obj, obj)
+        if not hasattr(user_obj, "_user_perm_cache"):
+            generation = get_generations(USER_PERMISSIONS_TABLE)
+            cached = users_permissions.get(user_obj.pk)
+            if cached is None or cached[0] != generation:
+                cached = (generation, frozenset(super().get_user_permissions(user_obj)))
+                users_permissions.set(user_obj.pk, cached)
+            user_obj._user_perm_cache = set(cached[1])
+        return user_obj._user_perm_cache
+
+    def get_group_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if user_obj.is_superuser:
+            return super().get_group_permissions(user_obj, obj)
+        if not hasattr(user_obj, "_group_perm_cache"):
+            permissions = get_groups_permissions()
+            user_obj._group_perm_cache = set().union(
+                *(permissions.get(group.pk, ()) for group in user_obj.groups.all())
+            )
+        return user_obj._group_perm_cache
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    Scrypt hasher with the PASSWORD_SCRYPT_* parameters.
+    A hash made with other parameters is updated on the next login of its user.
+    """
+
+    work_factor = getattr(settings, "PASSWORD_SCRYPT_WORK_FACTOR", 2**14)
+    block_size = getattr(settings, "PASSWORD_SCRYPT_BLOCK_SIZE", 8)
+    parallelism = getattr(settings, "PASSWORD_SCRYPT_PARALLELISM", 1)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id hasher with the PASSWORD_ARGON2_* parameters (requires argon2-cffi).
+    A hash made with other parameters is updated on the next login of its user.
+    """
+
+    time_cost = getattr(settings, "PASSWORD_ARGON2_TIME_COST", 2)
+    memory_cost = getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", 19456)
+    parallelism = getattr(settings, "PASSWORD_ARGON2_PARALLELISM", 1)
@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from helpers.hashers import verify_password
+
+CustomUser = get_user_model()
+
+BENCHMARK_PASSWORD = "benchmark-password!"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the logins per second of each installed password hasher with concurrent logins, "
+        "verifying the passwords in the request threads and in the verification pool. "
+        "Use --endpoint to post them to /api/login/ with a temporary user instead "
+        "(preferred hasher only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PASSWORD_VERIFICATION_WORKERS or 2,
+            help="Verification pool threads compared with verifying in the request threads.",
+        )
+        parser.add_argument("--endpoint", action="store_true")
+
+    def handle(self, *args, **options):
+        for algorithm, hasher in self.get_hashers(options):
+            encoded = hasher.encode(BENCHMARK_PASSWORD, hasher.salt())
+            self.stdout.write(self.style.MIGRATE_HEADING(algorithm))
+            for workers in (0, options["workers"]):
+                with override_settings(PASSWORD_VERIFICATION_WORKERS=workers):
+                    if options["endpoint"]:
+                        elapsed = self.benchmark_endpoint(encoded, options)
+                    else:
+                        elapsed = self.benchmark_verification(encoded, options)
+                label = f"{workers} pool threads" if workers else "request threads"
+                self.stdout.write(
+                    f"  {label}: {options['logins'] / elapsed:.1f} logins/s "
+                    f"({elapsed / options['logins'] * 1000:.1f} ms per login)"
+                )
+
+    def get_hashers(self, options):
+        """
+        Return the installed hashers of PASSWORD_HASHERS, skipping the ones missing their library.
+        Only the preferred one is returned for the endpoint, the other hashes being updated on login.
+        """
+
+        hashers = []
+        for hasher in get_hashers()[:1] if options["endpoint"] else get_hashers():
+            try:
+                if hasher.library:
+                    hasher._load_library()
+            except ValueError as error:
+                self.stderr.write(f"{hasher.algorithm} skipped: {error}")
+                continue
+            hashers.append((hasher.algorithm, hasher))
+        return hashers
+
+    @staticmethod
+    def run_concurrently(login, options):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(lambda _: login(), range(options["logins"])))
+        elapsed = time.perf_counter() - start
+        if not all(results):
+            raise CommandError("A benchmark login failed.")
+        return elapsed
+
+    def benchmark_verification(self, encoded, options):
+        return self.run_concurrently(lambda: verify_password(BENCHMARK_PASSWORD, encoded), options)
+
+    def benchmark_endpoint(self, encoded, options):
+        user = CustomUser.objects.create(email="benchmark.login@epicevents.local", password=encoded)
+        url = reverse("login")
+        data = {"email": user.email, "password": BENCHMARK_PASSWORD}
+
+        def login():
+            return Client().post(url, data=data).status_code == 200
+
+        try:
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                return self.run_concurrently(login, options)
+        finally:
+            user.delete()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from accounts.permissions import DEFAULT_GROUP_PERMISSIONS, create_default_groups
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the department groups and add their missing default permissions "
+        "(run after each migrate by a post_migrate receiver)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Remove the permissions granted to the groups besides their default ones.",
+        )
+
+    def handle(self, *args, **options):
+        create_default_groups(using=options["database"], prune=options["prune"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{', '.join(DEFAULT_GROUP_PERMISSIONS)} groups created or updated.")
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the expired outstanding and blacklisted tokens by batches. "
+        "Meant to be run periodically, e.g. from a cron job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        now = timezone.now()
+        expired_tokens = OutstandingToken.objects.filter(expires_at__lte=now).order_by()
+        outstanding_deleted = blacklisted_deleted = 0
+
+        while True:
+            batch = list(expired_tokens.values_list("id", flat=True)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                deleted, _ = BlacklistedToken.objects.filter(token_id__in=batch).delete()
+                blacklisted_deleted += deleted
+                deleted, _ = OutstandingToken.objects.filter(id__in=batch).delete()
+                outstanding_deleted += deleted
+            if len(batch) < batch_size:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{outstanding_deleted} outstanding and {blacklisted_deleted} blacklisted "
+                "expired token(s) deleted."
+            )
+        )
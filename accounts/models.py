@@ -1,13 +1,19 @@
+import time
 import uuid
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser, BaseUserManager, Group
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from django.db.models import F, Value
+from django.db.models.functions import Concat
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from helpers.cache import get_generations
+from helpers.hashers import verify_password
 from helpers.validators import unicodealphavalidator
 from helpers.models import TimestampedModel
-from .permissions import add_default_permissions_to_groups
+from .permissions import create_default_groups
 
 
 class CustomUserManager(BaseUserManager):
@@ -66,6 +72,20 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    def check_password(self, raw_password):
+        """
+        Check the password in the verification pool (see helpers.hashers),
+        saving its new hash when it was made by another hasher or with other parameters.
+        """
+
+        def setter(encoded):
+            self.password = encoded
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return verify_password(raw_password, self.password, setter)
+
     def __str__(self):
         return f"{self.email}, administrateur: {self.is_staff}, actif: {self.is_active}"
 
@@ -100,41 +120,90 @@ class Employee(TimestampedModel):
 
     class Meta:
         ordering = ["department", "last_name"]
+        indexes = [
+            models.Index(fields=["department", "last_name"], name="employee_department_idx"),
+            models.Index(fields=["-created_at", "-employee_id"], name="employee_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"Employé {self.last_name} {self.first_name} du département {self.department}"
 
+    @staticmethod
+    def get_str_expression(prefix=""):
+        """Return the database expression of __str__, prefix being the lookup of the employee relation."""
+
+        return Concat(
+            Value("Employé "),
+            F(f"{prefix}last_name"),
+            Value(" "),
+            F(f"{prefix}first_name"),
+            Value(" du département "),
+            F(f"{prefix}department"),
+            output_field=models.CharField(),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keep the loaded department to detect its changes on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_department = instance.__dict__.get("department")
+        return instance
+
+
+DEPARTMENT_GROUPS = {"MANAGEMENT": "management", "SALES": "sales", "SUPPORT": "support"}
+department_groups = {"generation": None, "loaded_at": None, "ids": {}}
+
+
+def get_department_group_ids():
+    """
+    Return the group id of each department, creating the default groups if they don't exist.
+    The ids are kept by the process until a group is saved or deleted,
+    or for PERMISSIONS_CACHE_TIMEOUT seconds at most.
+    """
+
+    generation = get_generations(Group._meta.db_table)
+    if (
+        department_groups["generation"] != generation
+        or time.monotonic() - department_groups["loaded_at"]
+        >= getattr(settings, "PERMISSIONS_CACHE_TIMEOUT", 5)
+    ):
+        group_ids = dict(
+            Group.objects.filter(name__in=DEPARTMENT_GROUPS.values()).values_list("name", "pk")
+        )
+        if not group_ids:
+            # The groups are created after migrate (see accounts.signals), unless the database was flushed.
+            group_ids = create_default_groups()
+            generation = get_generations(Group._meta.db_table)
+        department_groups["ids"] = {
+            department: group_ids.get(group_name)
+            for department, group_name in DEPARTMENT_GROUPS.items()
+        }
+        department_groups["generation"] = generation
+        department_groups["loaded_at"] = time.monotonic()
+    return department_groups["ids"]
+
 
 @receiver(post_save, sender=Employee)
-def add_groups_with_default_permissions(sender, instance, **kwargs):
+def add_groups_with_default_permissions(sender, instance, created, **kwargs):
     """
-    Create users groups if they don't exist.
-    Remove user from all groups if change (the user can only be part of one).
-    Add a user to the group based on their department with their default permissions.
-    Add is_staff permission to linked users if the employee's department is MANAGEMENT.
+    Set the user group based on their department with their default permissions
+    (the user can only be part of one).
+    Set is_staff permission of linked users if the employee's department is MANAGEMENT.
+    Nothing is done when the department did not change since the employee was loaded.
     """
 
-    groups = Group.objects.all()
-    if len(groups) == 0:
-        management_group = Group.objects.create(name="management")
-        sales_group = Group.objects.create(name="sales")
-        support_group = Group.objects.create(name="support")
-        add_default_permissions_to_groups(management_group, sales_group, support_group)
-
-    user_groups = instance.user.groups.all()
-    for group in user_groups:
-        group.user_set.remove(instance.user)
-
-    if instance.department == "MANAGEMENT":
-        instance.user.groups.add(Group.objects.get(name="management"))
-        instance.user.is_staff = True
-    else:
-        if instance.department == "SALES":
-            instance.user.groups.add(Group.objects.get(name="sales"))
-        elif instance.department == "SUPPORT":
-            instance.user.groups.add(Group.objects.get(name="support"))
-        instance.user.is_staff = False
-    instance.user.save()
+    if not created and instance.department == getattr(instance, "_loaded_department", None):
+        return
+
+    group_id = get_department_group_ids().get(instance.department)
+    user = instance.user
+    user.groups.set([group_id] if group_id else [])
+
+    is_staff = instance.department == "MANAGEMENT"
+    if user.is_staff != is_staff:
+        user.is_staff = is_staff
+        user.save(update_fields=["is_staff"])
+    instance._loaded_department = instance.department
 
 
 @receiver(post_delete, sender=Employee)
@@ -1,89 +1,158 @@
-from django.contrib.auth.models import Permission
+import operator
+from functools import reduce
 
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.permissions import BasePermission
 
-def add_default_permissions_to_groups(management_group, sales_group, support_group):
+from helpers.cache import bump_generation
+
+# Default permissions of each group.
+# In accordance with company document retention periods,
+# permissions to delete client contracts and events are not available by default.
+# Only the management group can access the CRUD of the user and employee models,
+# add and change contracts, change_client, delete_client and change_event.
+# All employees can see location, client, contract and event models.
+# Sales and support groups can add and change location model.
+# Only the sales group can add client.
+DEFAULT_GROUP_PERMISSIONS = {
+    "management": [
+        "accounts.add_customuser",
+        "accounts.change_customuser",
+        "accounts.view_customuser",
+        "accounts.add_employee",
+        "accounts.change_employee",
+        "accounts.delete_employee",
+        "accounts.view_employee",
+        "locations.add_location",
+        "locations.change_location",
+        "locations.delete_location",
+        "locations.view_location",
+        "clients.change_client",
+        "clients.delete_client",
+        "clients.view_client",
+        "contracts.add_contract",
+        "contracts.change_contract",
+        "contracts.delete_contract",
+        "contracts.view_contract",
+        "events.change_event",
+        "events.view_event",
+    ],
+    "sales": [
+        "locations.add_location",
+        "locations.change_location",
+        "locations.delete_location",
+        "locations.view_location",
+        "clients.add_client",
+        "clients.view_client",
+        "contracts.view_contract",
+        "events.view_event",
+    ],
+    "support": [
+        "locations.add_location",
+        "locations.change_location",
+        "locations.delete_location",
+        "locations.view_location",
+        "clients.view_client",
+        "contracts.view_contract",
+        "events.view_event",
+    ],
+}
+
+
+def create_default_groups(using="default", prune=False):
     """
-    Add each required permission by default to groups.
-    In accordance with company document retention periods,
-    permissions to delete client contracts and events are not available by default.
-    Only the management_group can access the CRUD of the user and employee models,
-    add and change contracts, change_client, delete_client and change_event.
-    All employees can see location, client, contract and event models.
-    Sales_group and support_group can add and change location model.
-    Only the sales_group can add client.
+    Create the DEFAULT_GROUP_PERMISSIONS groups and add their missing permissions with bulk queries:
+    one insert of the missing groups, one select of the groups and one of the permissions
+    and one insert of the missing group permissions.
+    The permissions granted to the groups besides the default ones are kept,
+    unless prune is set: they are then deleted with one more query.
+    The inserts ignore the existing rows, so it is safe under concurrent calls.
     """
 
-    add_user = Permission.objects.get(codename="add_customuser")
-    change_user = Permission.objects.get(codename="change_customuser")
-    view_user = Permission.objects.get(codename="view_customuser")
-
-    add_employee = Permission.objects.get(codename="add_employee")
-    change_employee = Permission.objects.get(codename="change_employee")
-    delete_employee = Permission.objects.get(codename="delete_employee")
-    view_employee = Permission.objects.get(codename="view_employee")
-
-    add_location = Permission.objects.get(codename="add_location")
-    change_location = Permission.objects.get(codename="change_location")
-    delete_location = Permission.objects.get(codename="delete_location")
-    view_location = Permission.objects.get(codename="view_location")
-
-    add_client = Permission.objects.get(codename="add_client")
-    change_client = Permission.objects.get(codename="change_client")
-    delete_client = Permission.objects.get(codename="delete_client")
-    view_client = Permission.objects.get(codename="view_client")
-
-    add_contract = Permission.objects.get(codename="add_contract")
-    change_contract = Permission.objects.get(codename="change_contract")
-    delete_contract = Permission.objects.get(codename="delete_contract")
-    view_contract = Permission.objects.get(codename="view_contract")
-
-    change_event = Permission.objects.get(codename="change_event")
-    view_event = Permission.objects.get(codename="view_event")
-
-    management_group.permissions.set(
-        [
-            add_user,
-            change_user,
-            view_user,
-            add_employee,
-            change_employee,
-            delete_employee,
-            view_employee,
-            add_location,
-            change_location,
-            delete_location,
-            view_location,
-            change_client,
-            delete_client,
-            view_client,
-            add_contract,
-            change_contract,
-            delete_contract,
-            view_contract,
-            change_event,
-            view_event,
-        ]
-    )
-    sales_group.permissions.set(
-        [
-            add_location,
-            change_location,
-            delete_location,
-            view_location,
-            add_client,
-            view_client,
-            view_contract,
-            view_event,
-        ]
-    )
-    support_group.permissions.set(
-        [
-            add_location,
-            change_location,
-            delete_location,
-            view_location,
-            view_client,
-            view_contract,
-            view_event,
-        ]
-    )
+    through = Group.permissions.through
+    with transaction.atomic(using=using):
+        Group.objects.using(using).bulk_create(
+            [Group(name=name) for name in DEFAULT_GROUP_PERMISSIONS], ignore_conflicts=True
+        )
+        group_ids = dict(
+            Group.objects.using(using)
+            .filter(name__in=DEFAULT_GROUP_PERMISSIONS)
+            .values_list("name", "pk")
+        )
+
+        perms = {perm for group_perms in DEFAULT_GROUP_PERMISSIONS.values() for perm in group_perms}
+        permission_ids = {
+            f"{app_label}.{codename}": pk
+            for pk, app_label, codename in Permission.objects.using(using)
+            .filter(codename__in=[perm.split(".")[1] for perm in perms])
+            .values_list("pk", "content_type__app_label", "codename")
+        }
+        missing_perms = perms - set(permission_ids)
+        if missing_perms:
+            raise Permission.DoesNotExist(
+                f"Missing permissions: {', '.join(sorted(missing_perms))}."
+            )
+
+        group_permission_ids = {
+            group_ids[name]: [permission_ids[perm] for perm in group_perms]
+            for name, group_perms in DEFAULT_GROUP_PERMISSIONS.items()
+        }
+        through.objects.using(using).bulk_create(
+            [
+                through(group_id=group_id, permission_id=permission_id)
+                for group_id, group_permissions in group_permission_ids.items()
+                for permission_id in group_permissions
+            ],
+            ignore_conflicts=True,
+        )
+        if prune:
+            through.objects.using(using).filter(
+                reduce(
+                    operator.or_,
+                    (
+                        Q(group_id=group_id) & ~Q(permission_id__in=group_permissions)
+                        for group_id, group_permissions in group_permission_ids.items()
+                    ),
+                )
+            ).delete()
+
+    # The bulk queries do not send the signals invalidating the groups caches.
+    bump_generation(Group._meta.db_table)
+    bump_generation(through._meta.db_table)
+    return group_ids
+
+
+def get_token_claim(request, claim):
+    """Return the claim of the request access token or None if the token does not embed it."""
+
+    token = getattr(request, "auth", None)
+    if token is None or not hasattr(token, "payload"):
+        return None
+    return token.payload.get(claim)
+
+
+def request_is_staff(request):
+    """Return the is_staff claim of the request access token or the requesting user is_staff."""
+
+    is_staff = get_token_claim(request, "is_staff")
+    if is_staff is None:
+        return bool(request.user and request.user.is_staff)
+    return is_staff
+
+
+def request_has_perm(request, perm):
+    """Check the permission against the request access token claims or the requesting user permissions."""
+
+    permissions = get_token_claim(request, "permissions")
+    if permissions is None:
+        return request.user.has_perm(perm)
+    return bool(get_token_claim(request, "is_superuser")) or perm in permissions
+
+
+class IsAdminUser(BasePermission):
+    """IsAdminUser trusting the is_staff claim of the access token when it embeds it."""
+
+    def has_permission(self, request, view):
+        return request_is_staff(request)
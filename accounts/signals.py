@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.management import create_permissions
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from helpers.cache import bump_generation, register_generation_tables
+from .authentication import invalidate_cached_user
+from .backends import GROUP_PERMISSIONS_TABLE, USER_PERMISSIONS_TABLE
+from .models import Employee
+from .permissions import create_default_groups
+
+CustomUser = get_user_model()
+
+# The login updates of the users (last_login and rehashed password) are not displayed.
+LOGIN_UPDATE_FIELDS = {"last_login", "password"}
+# is_staff is updated on the save of the employee department (see accounts.models).
+EMPLOYEE_UPDATE_FIELDS = LOGIN_UPDATE_FIELDS | {"is_staff"}
+
+register_generation_tables(CustomUser._meta.db_table)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_cached_user_on_user_change(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def touch_user_employee(sender, instance, update_fields=None, **kwargs):
+    """
+    Bump the generation of the users table and update the updated_at of the user employee,
+    so that the employee responses validators (see apis.mixins.ConditionalRequestMixin) change with the user.
+    """
+
+    if update_fields and set(update_fields) <= LOGIN_UPDATE_FIELDS:
+        return
+    bump_generation(CustomUser._meta.db_table)
+    if update_fields and set(update_fields) <= EMPLOYEE_UPDATE_FIELDS:
+        return
+    if Employee.objects.filter(user_id=instance.pk).update(updated_at=timezone.now()):
+        bump_generation(Employee._meta.db_table)
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def invalidate_cached_user_on_employee_change(sender, instance, **kwargs):
+    invalidate_cached_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_cached_user_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the users added to or removed from a group, from either side of the relation."""
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_cached_user(instance.pk)
+    elif action == "pre_clear":
+        for user_id in instance.user_set.values_list("pk", flat=True):
+            invalidate_cached_user(user_id)
+    else:
+        for user_id in pk_set:
+            invalidate_cached_user(user_id)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_department_groups(sender, **kwargs):
+    bump_generation(Group._meta.db_table)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_groups_permissions_on_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_generation(GROUP_PERMISSIONS_TABLE)
+
+
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def invalidate_users_permissions_on_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_generation(USER_PERMISSIONS_TABLE)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_permissions_on_delete(sender, **kwargs):
+    """The permissions relation rows deleted in cascade do not send m2m_changed."""
+
+    bump_generation(GROUP_PERMISSIONS_TABLE)
+    bump_generation(USER_PERMISSIONS_TABLE)
+
+
+@receiver(post_migrate)
+def create_default_groups_after_migrate(sender, using, verbosity=1, **kwargs):
+    """
+    Create the default groups with their permissions once the accounts app is migrated,
+    so that no request has to. The permissions of the apps migrated after accounts
+    are created first.
+    """
+
+    if sender.label != "accounts":
+        return
+
+    for app_config in sender.apps.get_app_configs():
+        create_permissions(app_config, verbosity=0, using=using)
+    create_default_groups(using=using)
+    if verbosity >= 2:
+        print("Default groups and permissions created.")
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Employee
+
+CustomUser = get_user_model()
+
+USER_CLAIMS = ("employee_id", "department", "is_staff", "is_superuser", "permissions")
+
+
+def get_user_claims(user):
+    """Return the authorization claims of the user embedded in its access tokens."""
+
+    try:
+        employee = user.employee
+    except Employee.DoesNotExist:
+        employee = None
+    return {
+        "employee_id": str(employee.employee_id) if employee else None,
+        "department": employee.department if employee else None,
+        "is_staff": user.is_staff,
+        "is_superuser": user.is_superuser,
+        "permissions": sorted(user.get_all_permissions()),
+    }
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens embed the user claims, computed again
+    each time an access token is created (login and refresh).
+    The claims are trusted by accounts.permissions within the access token lifetime.
+    """
+
+    no_copy_claims = RefreshToken.no_copy_claims + USER_CLAIMS
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        try:
+            user = CustomUser.objects.select_related("employee").get(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            )
+        except CustomUser.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        for claim, value in get_user_claims(user).items():
+            access[claim] = value
+        return access
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
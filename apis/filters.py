@@ -1,5 +1,13 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
 from contracts.models import Contract
 from events.models import Event
@@ -57,3 +65,43 @@ class EventFilter(filters.FilterSet):
             "support_contact_first_name",
             "support_contact_last_name",
         ]
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    Search filter backed by the pg_trgm GIN indexes on PostgreSQL.
+    Each search term matches the search_fields containing it or a similar word
+    and the results are ranked by trigram word similarity.
+    Falls back to the default icontains search on other databases.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if (
+            not search_fields
+            or not search_terms
+            or connections[queryset.db].vendor != "postgresql"
+        ):
+            return super().filter_queryset(request, queryset, view)
+
+        ranks = []
+        for search_term in search_terms:
+            term_filter = Q()
+            for search_field in search_fields:
+                term_filter |= Q(**{f"{search_field}__icontains": search_term})
+                term_filter |= Q(**{f"{search_field}__trigram_word_similar": search_term})
+            queryset = queryset.filter(term_filter)
+
+            similarities = [
+                TrigramWordSimilarity(search_term, search_field)
+                for search_field in search_fields
+            ]
+            ranks.append(
+                Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+            )
+
+        return queryset.annotate(search_rank=reduce(operator.add, ranks)).order_by(
+            "-search_rank", *queryset.model._meta.ordering
+        )
@@ -0,0 +1,50 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apis.renderers import ORJSONRenderer, orjson
+from apis.serializers import ContractListSerializer, EventDetailSerializer
+from contracts.models import Contract
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the rendering time of the DRF JSONRenderer and of the ORJSONRenderer "
+        "on the EventDetailSerializer and ContractListSerializer data of the database rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Number of events and contracts.")
+        parser.add_argument("--repeat", type=int, default=100)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed, ORJSONRenderer would use the stdlib json.")
+
+        rows = options["rows"]
+        events = EventDetailSerializer.setup_eager_loading(Event.objects.all())[:rows]
+        contracts = ContractListSerializer.setup_eager_loading(Contract.objects.all())[:rows]
+        payloads = [
+            ("EventDetailSerializer", EventDetailSerializer(events, many=True).data),
+            ("ContractListSerializer", ContractListSerializer(contracts, many=True).data),
+        ]
+
+        for label, data in payloads:
+            if not data:
+                raise CommandError(f"No rows to serialize with {label}.")
+            rendered = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != rendered:
+                raise CommandError(f"The renderers outputs of {label} differ.")
+
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"{label}: {len(data)} rows, {len(rendered)} bytes")
+            )
+            timings = {}
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                seconds = timeit.timeit(lambda: renderer.render(data), number=options["repeat"])
+                timings[renderer] = seconds / options["repeat"] * 1000
+                self.stdout.write(f"  {type(renderer).__name__}: {timings[renderer]:.3f} ms")
+            json_time, orjson_time = timings.values()
+            self.stdout.write(self.style.SUCCESS(f"  x{json_time / orjson_time:.1f}"))
@@ -0,0 +1,75 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import Employee
+from apis.serializers import (
+    ClientListSerializer,
+    ContractListSerializer,
+    EmployeeListSerializer,
+    EventListSerializer,
+    ValuesSerializer,
+)
+from clients.models import Client
+from contracts.models import Contract
+from events.models import Event
+
+LIST_SERIALIZERS = [
+    (ContractListSerializer, Contract),
+    (EventListSerializer, Event),
+    (ClientListSerializer, Client),
+    (EmployeeListSerializer, Employee),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time to serialize the --rows first rows of the lists with their ModelSerializer "
+        "and with their ValuesSerializer, without and with the query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        for serializer_class, model in LIST_SERIALIZERS:
+            queryset = serializer_class.setup_eager_loading(model.objects.order_by("pk"))[: options["rows"]]
+            values_serializer = ValuesSerializer(serializer_class)
+            values_queryset = values_serializer.get_values_queryset(model.objects.order_by("pk"))[: options["rows"]]
+
+            instances = list(queryset)
+            rows = list(values_queryset)
+            if not rows:
+                raise CommandError(f"No {model._meta.verbose_name} to serialize.")
+            if JSONRenderer().render(values_serializer.to_representation(rows)) != JSONRenderer().render(
+                serializer_class(instances, many=True).data
+            ):
+                raise CommandError(f"The {serializer_class.__name__} outputs differ.")
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{serializer_class.__name__}: {len(rows)} rows"))
+            timings = [
+                (
+                    "serialization",
+                    lambda: serializer_class(instances, many=True).data,
+                    lambda: values_serializer.to_representation(rows),
+                ),
+                (
+                    "query and serialization",
+                    lambda: serializer_class(queryset.all(), many=True).data,
+                    lambda: values_serializer.to_representation(values_queryset.all()),
+                ),
+            ]
+            for label, serialize, serialize_values in timings:
+                serializer_time = self.time(serialize, options["repeat"])
+                values_time = self.time(serialize_values, options["repeat"])
+                self.stdout.write(
+                    f"  {label}: ModelSerializer {serializer_time:.2f} ms, "
+                    f"ValuesSerializer {values_time:.2f} ms "
+                    + self.style.SUCCESS(f"x{serializer_time / values_time:.1f}")
+                )
+
+    @staticmethod
+    def time(function, repeat):
+        return timeit.timeit(function, number=repeat) / repeat * 1000
@@ -0,0 +1,139 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import Employee
+from clients.models import Client
+from contracts.models import Contract
+from events.models import Event
+
+INDEXED_MODELS = [Employee, Client, Contract, Event]
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the EXPLAIN plans of the list endpoints filters without and with the models indexes. "
+        "Use --seed on a development database to create a large dataset first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Number of clients with a contract (and an event if signed) to create, e.g. 1000000.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--analyze", action="store_true", help="Run EXPLAIN ANALYZE instead of EXPLAIN."
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"], options["batch_size"])
+
+        explain_options = {"analyze": True} if options["analyze"] else {}
+        compare_without_indexes = connection.vendor == "postgresql"
+        if not compare_without_indexes:
+            self.stderr.write("Only the plans with indexes are printed on a database other than PostgreSQL.")
+
+        for label, queryset in self.get_querysets():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            if compare_without_indexes:
+                self.stdout.write(self.style.WARNING("Without indexes:"))
+                self.stdout.write(self.explain_without_indexes(queryset, explain_options))
+            self.stdout.write(self.style.SUCCESS("With indexes:"))
+            self.stdout.write(queryset.explain(**explain_options))
+
+    @staticmethod
+    def get_querysets():
+        """Return the querysets built by the list views filters and orderings."""
+
+        now = timezone.now()
+        return [
+            ("GET /api/contracts/?is_signed=false", Contract.objects.filter(is_signed=False)[:10]),
+            (
+                "GET /api/contracts/?min_payment_due=1000",
+                Contract.objects.filter(payment_due__gt=1000).exclude(payment_due=0.0)[:10],
+            ),
+            (
+                "GET /api/contracts/?pagination=cursor&cursor=...",
+                Contract.objects.filter(created_at__lt=now - timedelta(days=1)).order_by(
+                    "-created_at", "-pk"
+                )[:11],
+            ),
+            (
+                "GET /api/events/?order_by=start_date",
+                Event.objects.filter(start_date__gte=now).order_by("start_date")[:10],
+            ),
+            ("GET /api/clients/", Client.objects.all()[:10]),
+            (
+                "GET /api/clients/?contract_requested=true",
+                Client.objects.filter(contract_requested=True)[:10],
+            ),
+        ]
+
+    @staticmethod
+    def explain_without_indexes(queryset, explain_options):
+        """Drop the models indexes in a transaction rolled back once the plan is explained."""
+
+        with transaction.atomic():
+            with connection.schema_editor(atomic=False) as schema_editor:
+                for model in INDEXED_MODELS:
+                    for index in model._meta.indexes:
+                        schema_editor.remove_index(model, index)
+            plan = queryset.explain(**explain_options)
+            transaction.set_rollback(True)
+        return plan
+
+    def seed(self, count, batch_size):
+        now = timezone.now()
+        first_siren = Client.objects.count()
+        sales_contact = Employee.objects.filter(department="SALES").first()
+
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            clients = Client.objects.bulk_create(
+                [
+                    Client(
+                        company_name=f"Entreprise {start + index}",
+                        siren=f"{(first_siren + start + index) % 10**9:09}",
+                        contract_requested=index % 50 == 0,
+                        sales_contact=sales_contact,
+                    )
+                    for index in range(size)
+                ]
+            )
+            contracts = Contract.objects.bulk_create(
+                [
+                    Contract(
+                        client=client,
+                        amount=1000 * random.randint(1, 100),
+                        payment_due=random.choice([0.0, 1000 * random.randint(1, 100)]),
+                        is_signed=random.random() < 0.8,
+                    )
+                    for client in clients
+                ]
+            )
+            events = []
+            for contract in contracts:
+                if contract.is_signed:
+                    start_date = now + timedelta(days=random.randint(-365, 365))
+                    events.append(
+                        Event(
+                            contract=contract,
+                            start_date=start_date,
+                            end_date=start_date + timedelta(hours=6),
+                            attendees=random.randint(1, 500),
+                        )
+                    )
+            Event.objects.bulk_create(events)
+            self.stdout.write(f"{start + size}/{count} clients, contracts and events created.")
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                for model in INDEXED_MODELS:
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from apis.mixins import get_response_cache, get_response_cache_metric_key
+from apis.views import ContractListAPIView, EventListAPIView
+
+CACHED_LIST_VIEWS = (ContractListAPIView, EventListAPIView)
+METRICS = ("hits", "misses")
+
+
+class Command(BaseCommand):
+    help = (
+        "Display the hits, misses and hit ratio of the cached list responses of each view "
+        "since the metrics were reset (see apis.mixins.ResponseCacheMixin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the metrics after displaying them.")
+
+    def handle(self, *args, **options):
+        cache = get_response_cache()
+        keys = [
+            get_response_cache_metric_key(view.__name__, metric)
+            for view in CACHED_LIST_VIEWS
+            for metric in METRICS
+        ]
+        values = cache.get_many(keys)
+
+        for view in CACHED_LIST_VIEWS:
+            hits, misses = (
+                values.get(get_response_cache_metric_key(view.__name__, metric), 0) for metric in METRICS
+            )
+            ratio = f"{hits / (hits + misses):.1%}" if hits + misses else "-"
+            self.stdout.write(f"{view.__name__}: {hits} hits, {misses} misses, hit ratio {ratio}")
+
+        if options["reset"]:
+            cache.delete_many(keys)
+            self.stdout.write(self.style.SUCCESS("Metrics reset."))
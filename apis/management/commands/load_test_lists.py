@@ -0,0 +1,79 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.tokens import ClaimsRefreshToken
+
+CustomUser = get_user_model()
+
+LIST_URL_NAMES = ("clients", "contracts", "events")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the requests per second of the clients, contracts and events lists served "
+        "as under WSGI (a worker with --threads threads) and as under ASGI (a worker event loop "
+        "with --concurrency requests in flight), with the token of the --email user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", required=True)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--query", default="", help="Query string of the requests, e.g. count=exact.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email=options["email"])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with the email {options['email']}.")
+        headers = {"Authorization": f"Bearer {ClaimsRefreshToken.for_user(user).access_token}"}
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for url_name in LIST_URL_NAMES:
+                url = f"{reverse(url_name)}?{options['query']}"
+                self.stdout.write(self.style.MIGRATE_HEADING(url))
+                for label, load_test in (("WSGI", self.load_test_wsgi), ("ASGI", self.load_test_asgi)):
+                    elapsed, status_codes = load_test(url, headers, options)
+                    if set(status_codes) != {200}:
+                        raise CommandError(f"{label} responses status codes: {sorted(set(status_codes))}")
+                    self.stdout.write(
+                        f"  {label}: {options['requests'] / elapsed:.1f} requests/s "
+                        f"({elapsed / options['requests'] * 1000:.1f} ms per request)"
+                    )
+
+    @staticmethod
+    def load_test_wsgi(url, headers, options):
+        def get(_):
+            return Client().get(url, headers=headers).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            status_codes = list(executor.map(get, range(options["requests"])))
+        return time.perf_counter() - start, status_codes
+
+    @staticmethod
+    def load_test_asgi(url, headers, options):
+        async def get(client, semaphore):
+            # Each request gets its own thread for its sync code, as with django.core.asgi.
+            async with semaphore, ThreadSensitiveContext():
+                return (await client.get(url, headers=headers)).status_code
+
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(options["concurrency"])
+            return await asyncio.gather(
+                *(get(client, semaphore) for _ in range(options["requests"]))
+            )
+
+        start = time.perf_counter()
+        status_codes = asyncio.run(run())
+        return time.perf_counter() - start, status_codes
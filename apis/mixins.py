@@ -0,0 +1,459 @@
+import asyncio
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from helpers.cache import aget_generations, aincr_counter, get_generations, get_queryset_tables
+from helpers.context import get_permission_context
+from locations.models import Location
+from .serializers import FieldSelection, LocationDetailSerializer
+
+
+class EagerLoadingMixin:
+    """
+    View mixin loading the relations declared by the serializer with the queryset,
+    so that list pages run a constant number of queries whatever their size.
+    On read requests with ?fields=, ?exclude= or ?expand=, only the columns and relations
+    of the selected fields are loaded (see apis.serializers.FieldSelection).
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+
+        if hasattr(serializer_class, "setup_sparse_loading"):
+            # The queryset can be built by initial() (see PermissionContextMixin), before
+            # the format_kwarg of get_serializer_context() is set.
+            serializer = serializer_class(context={"request": self.request, "view": self})
+            queryset = serializer.setup_sparse_loading(queryset, self.get_loaded_fields())
+        return queryset
+
+    def get_loaded_fields(self):
+        """Return the fields read from the instances besides the serializer ones (the keyset cursor)."""
+
+        return [
+            field.lstrip("-")
+            for field in getattr(self, "keyset_ordering", ())
+            if field.lstrip("-") != "pk"
+        ]
+
+
+class AsyncListMixin:
+    """
+    View mixin serving the requests in the event loop under ASGI.
+    The list page and its count are queried with the async ORM, so that a worker keeps
+    serving other requests while waiting for them. The authentication and the other handlers
+    (e.g. post) run in a thread with sync_to_async.
+    Under WSGI the view is run by the handler with async_to_sync.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([item async for item in queryset], many=True)
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+
+class ValuesListMixin:
+    """
+    View mixin serializing the list pages with its values_serializer (see apis.serializers.ValuesSerializer)
+    from values() rows, for the read requests without field selection.
+    The view must also be an EagerLoadingMixin view.
+    """
+
+    values_serializer = None
+
+    def use_values_serializer(self):
+        return (
+            self.values_serializer is not None
+            and self.request.method in ("GET", "HEAD")
+            and FieldSelection.from_request(self.request) is None
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.use_values_serializer():
+            loaded_fields = self.get_loaded_fields()
+            if getattr(self, "keyset_ordering", None):
+                loaded_fields.append("pk")
+            queryset = self.values_serializer.get_values_queryset(queryset, loaded_fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get("many") and self.use_values_serializer():
+            return ValuesSerializerData(self.values_serializer.to_representation(args[0]))
+        return super().get_serializer(*args, **kwargs)
+
+
+class ValuesSerializerData:
+    """The serialized data of a ValuesSerializer, as returned by serializer.data."""
+
+    def __init__(self, data):
+        self.data = data
+
+
+class BulkLocationsCreateMixin:
+    """
+    View mixin adding a list of locations to a client or an event with a constant number of queries:
+    the items are validated together, the existing locations are fetched by fingerprint in one query,
+    the missing ones are created in one insert and the relation rows are written in one insert.
+    """
+
+    def add_locations(self, instance, locations_data):
+        serializer = LocationDetailSerializer(data=locations_data, many=True)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, list):
+                errors = next(item_errors for item_errors in errors if item_errors)
+            raise ValidationError(errors)
+
+        fingerprints = [Location.get_fingerprint(data) for data in serializer.validated_data]
+        locations_data = dict(zip(fingerprints, serializer.validated_data))
+        locations = {}
+
+        if locations_data:
+            with transaction.atomic():
+                locations = Location.objects.in_bulk(locations_data, field_name="fingerprint")
+                missing_locations = [
+                    Location(fingerprint=fingerprint, **data)
+                    for fingerprint, data in locations_data.items()
+                    if fingerprint not in locations
+                ]
+                if missing_locations:
+                    # Locations created by a concurrent request since the lookup are fetched back.
+                    Location.objects.bulk_create(missing_locations, ignore_conflicts=True)
+                    locations.update(
+                        Location.objects.in_bulk(
+                            [location.fingerprint for location in missing_locations],
+                            field_name="fingerprint",
+                        )
+                    )
+                instance.locations.add(*locations.values())
+
+        locations_added = [locations[fingerprint] for fingerprint in fingerprints]
+        locations_serializer = LocationDetailSerializer(locations_added, many=True)
+        return Response(data=locations_serializer.data, status=status.HTTP_201_CREATED)
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "La ressource a été modifiée depuis votre dernière lecture."
+    default_code = "precondition_failed"
+
+
+class NotModified(Exception):
+    """Raised by the precondition checks of a conditional GET to answer 304 Not Modified."""
+
+
+def get_loaded_instances(instance):
+    """Return the instance and the related instances loaded with it by select_related and prefetch_related."""
+
+    instances = {}
+    pending = [instance]
+    while pending:
+        current = pending.pop()
+        key = (current._meta.label, current.pk)
+        if key in instances:
+            continue
+        instances[key] = current
+        pending += [related for related in current._state.fields_cache.values() if related is not None]
+        for queryset in getattr(current, "_prefetched_objects_cache", {}).values():
+            pending += list(queryset)
+    return [instances[key] for key in sorted(instances, key=str)]
+
+
+class ConditionalRequestMixin:
+    """
+    View mixin answering the conditional requests (If-None-Match, If-Modified-Since, If-Match
+    and If-Unmodified-Since headers) from the ETag and Last-Modified validators of the response,
+    computed from the updated_at of the rows before serializing them.
+    The ETag also depends on the query parameters and the format of the response.
+    """
+
+    response_validators = None
+
+    def get_etag(self, *values):
+        signature = repr(
+            (self.request.accepted_renderer.format, sorted(self.request.query_params.lists()), values)
+        )
+        return quote_etag(hashlib.md5(signature.encode("utf-8")).hexdigest())
+
+    def check_preconditions(self, etag, last_modified):
+        """
+        Raise NotModified or PreconditionFailed according to the request conditional headers,
+        the validators being sent with the response otherwise.
+        """
+
+        self.set_response_validators(etag, last_modified)
+        self.check_response_validators()
+
+    def check_response_validators(self):
+        response = get_conditional_response(self.request, *self.response_validators)
+        if response is None:
+            return
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            raise NotModified()
+        raise PreconditionFailed()
+
+    def set_response_validators(self, etag, last_modified):
+        # The HTTP dates have a one second precision.
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        self.response_validators = (etag, timestamp)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return HttpResponseNotModified()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.response_validators is not None and (
+            status.is_success(response.status_code)
+            or response.status_code == status.HTTP_304_NOT_MODIFIED
+        ):
+            etag, last_modified = self.response_validators
+            response.headers["ETag"] = etag
+            if last_modified is not None:
+                response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class ConditionalDetailMixin(ConditionalRequestMixin):
+    """
+    Conditional requests of a detail view, its get_object() calling check_object_preconditions().
+    The validators are the primary keys and updated_at of the object and its loaded relations.
+    If-Match and If-Unmodified-Since make updates and deletions optimistic: they fail with
+    412 Precondition Failed when the object was modified since it was read by the client.
+    The object row is locked until the end of these requests so that the check cannot be raced.
+    """
+
+    write_precondition_headers = ("HTTP_IF_MATCH", "HTTP_IF_UNMODIFIED_SINCE")
+
+    def has_write_preconditions(self, request):
+        return request.method not in ("GET", "HEAD", "OPTIONS") and any(
+            header in request.META for header in self.write_precondition_headers
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.has_write_preconditions(request):
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_object_validators(self, obj):
+        instances = get_loaded_instances(obj)
+        updated_at = [
+            instance.updated_at for instance in instances if getattr(instance, "updated_at", None)
+        ]
+        etag = self.get_etag(
+            *(
+                (instance._meta.label, str(instance.pk), getattr(instance, "updated_at", None))
+                for instance in instances
+            )
+        )
+        return etag, max(updated_at, default=None)
+
+    def check_object_preconditions(self, obj):
+        if self.has_write_preconditions(self.request):
+            updated_at = (
+                type(obj)._default_manager.select_for_update()
+                .filter(pk=obj.pk)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+            if updated_at != obj.updated_at:
+                raise PreconditionFailed()
+
+        self.check_preconditions(*self.get_object_validators(obj))
+        if self.request.method not in ("GET", "HEAD"):
+            # The validators of the response are the ones of the updated object (see perform_update).
+            self.response_validators = None
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.set_response_validators(*self.get_object_validators(serializer.instance))
+
+
+class ConditionalListMixin(ConditionalRequestMixin):
+    """
+    Conditional requests of a paginated list view, checked once its page is fetched and before
+    it is serialized, so that they run no other query than the page ones.
+    The validators are the request path, the primary keys and updated_at of the page rows, the count
+    and next link of the page and the generations of the tables joined by the query
+    (e.g. for the labels of the related rows).
+    """
+
+    @staticmethod
+    def get_validated_queryset(queryset):
+        """Return the queryset loading the primary key and updated_at of the rows read by the validators."""
+
+        if queryset._fields is not None:
+            missing_fields = [field for field in ("pk", "updated_at") if field not in queryset._fields]
+            return queryset.values(*queryset._fields, *missing_fields) if missing_fields else queryset
+        field_names, defer = queryset.query.deferred_loading
+        if not defer and "updated_at" not in field_names:
+            return queryset.only(*field_names, "updated_at")
+        if defer and "updated_at" in field_names:
+            return queryset.defer(None).defer(*(field_names - {"updated_at"}))
+        return queryset
+
+    def get_list_validators(self, queryset, page, generations):
+        rows = [
+            (row["pk"], row["updated_at"]) if isinstance(row, dict) else (row.pk, row.updated_at)
+            for row in page
+        ]
+        # The query parameters are hashed by get_etag rather than the SQL ones, which can hold
+        # the request time (e.g. ExcludePastDateOrderingFilter).
+        etag = self.get_etag(
+            self.request.path,
+            getattr(self.paginator, "count", None),
+            self.paginator.get_next_link(),
+            rows,
+            generations,
+        )
+        return etag, max((updated_at for _, updated_at in rows), default=None)
+
+    def paginate_queryset(self, queryset):
+        queryset = self.get_validated_queryset(queryset)
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            generations = get_generations(*get_queryset_tables(queryset))
+            self.check_preconditions(*self.get_list_validators(queryset, page, generations))
+        return page
+
+    async def apaginate_queryset(self, queryset):
+        queryset = self.get_validated_queryset(queryset)
+        page = await super().apaginate_queryset(queryset)
+        if page is not None:
+            generations = await aget_generations(*get_queryset_tables(queryset))
+            self.check_preconditions(*self.get_list_validators(queryset, page, generations))
+        return page
+
+
+def get_response_cache():
+    return caches[getattr(settings, "LIST_RESPONSE_CACHE_ALIAS", "default")]
+
+
+def get_response_cache_metric_key(view_name, metric):
+    return f"list_response_cache:{view_name}:{metric}"
+
+
+class ResponseCacheMixin:
+    """
+    Async list view mixin caching the list responses in the LIST_RESPONSE_CACHE_ALIAS cache.
+    The responses are keyed on the request URL and format and on the generations of the
+    response_cache_models tables, the ones rendered by the list. Their save and delete signals
+    bump the generations (see apis.signals), so the cached responses are not read after a change.
+    The time dependent values (e.g. is_event_over) are up to LIST_RESPONSE_CACHE_TIMEOUT seconds old.
+    The cache hits and misses of each view are counted in the cache (see list_response_cache_stats).
+
+    The view must also be a ConditionalListMixin view: the response validators are cached
+    with its data to answer the conditional requests from the cache.
+    """
+
+    response_cache_models = ()
+
+    def get_response_cache_key(self, generations):
+        request = self.request
+        signature = repr(
+            (
+                type(self).__name__,
+                request.build_absolute_uri(request.path),
+                request.accepted_renderer.format,
+                sorted(request.query_params.lists()),
+                generations,
+            )
+        )
+        return "list_response:" + hashlib.md5(signature.encode("utf-8")).hexdigest()
+
+    async def alist(self, request, *args, **kwargs):
+        cache = get_response_cache()
+        tables = [model._meta.db_table for model in self.response_cache_models]
+        key = self.get_response_cache_key(await aget_generations(*tables))
+        cached = await cache.aget(key)
+
+        if cached is not None:
+            await aincr_counter(cache, get_response_cache_metric_key(type(self).__name__, "hits"))
+            data, self.response_validators = cached
+            self.check_response_validators()
+            return Response(data)
+
+        await aincr_counter(cache, get_response_cache_metric_key(type(self).__name__, "misses"))
+        response = await super().alist(request, *args, **kwargs)
+        await cache.aset(
+            key,
+            (response.data, self.response_validators),
+            timeout=getattr(settings, "LIST_RESPONSE_CACHE_TIMEOUT", 60),
+        )
+        return response
+
+
+class PermissionContextMixin:
+    """
+    View mixin reading the url client and event from the request permission context,
+    so that they are queried once for both the permissions checks and the view.
+    get_context_querysets() replaces the querysets the context loads them with.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        get_permission_context(request).querysets.update(self.get_context_querysets())
+        super().initial(request, *args, **kwargs)
+
+    def get_context_querysets(self):
+        return {}
+
+    def get_client(self):
+        return get_permission_context(self.request).get_client(self.kwargs["client_id"])
+
+    def get_event(self):
+        return get_permission_context(self.request).get_event(self.kwargs["event_id"])
@@ -0,0 +1,417 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from helpers.cache import are_generation_tables, aget_generations, get_generations, get_queryset_tables
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the view keyset_ordering fields, the last one being unique (pk).
+    A page is filtered on the position of the previous page last row instead of an offset
+    and no count is run, so every page costs the same whatever its depth.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = None
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        return self.get_page_results(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        return self.get_page_results([item async for item in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view):
+        """Return the queryset of the page rows and one more to know if there is a next page."""
+
+        self.request = request
+        self.ordering = view.keyset_ordering
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [self.invert_ordering(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self.get_position_filter(ordering, self.position))
+        return queryset[: self.page_size + 1]
+
+    def get_page_results(self, results):
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        if self.max_page_size:
+            return min(page_size, self.max_page_size)
+        return page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def invert_ordering(field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    @staticmethod
+    def get_field_name(field):
+        return field.lstrip("-")
+
+    def get_position_filter(self, ordering, position):
+        """
+        Return the rows strictly after the position in the ordering:
+        (a > x) OR (a = x AND b > y) for ascending (a, b) ordering.
+        """
+        position_filter = Q()
+        for index, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            row_filter = Q(
+                **{
+                    f"{self.get_field_name(field)}__{lookup}": position[index],
+                    **{
+                        self.get_field_name(previous): position[previous_index]
+                        for previous_index, previous in enumerate(ordering[:index])
+                    },
+                }
+            )
+            position_filter |= row_filter
+        return position_filter
+
+    def encode_cursor(self, item, reverse):
+        position = []
+        for field in self.ordering:
+            # The rows of values() querysets are dicts (see apis.serializers.ValuesSerializer).
+            field_name = self.get_field_name(field)
+            value = item[field_name] if isinstance(item, dict) else getattr(item, field_name)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+
+        cursor = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        encoded = urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        """Return the (position, reverse) of the cursor query parameter or (None, False)."""
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            raw_position = cursor["p"]
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.get_model_field(model, self.get_field_name(field)).to_python(value)
+                for field, value in zip(self.ordering, raw_position)
+            ]
+            return position, bool(cursor["r"])
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def get_model_field(model, field_name):
+        if field_name == "pk":
+            return model._meta.pk
+        return model._meta.get_field(field_name)
+
+
+class CountLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit offset pagination with a ?count= query parameter choosing how the count is computed:
+    - exact: COUNT(*) on every request.
+    - cached: exact count cached per request path and filters until a save or delete
+      of one of the filtered tables bumps its generation. The querysets reading a table
+      whose writes do not all bump its generation (see helpers.cache) are counted exactly.
+    - estimated: planner row estimate when above PAGINATION_COUNT_ESTIMATE_THRESHOLD
+      (PostgreSQL only), cached exact count below.
+    - none: no count, the next link is found by fetching one more row.
+    The default mode is the PAGINATION_COUNT_MODE setting.
+    """
+
+    count_query_param = "count"
+    count_modes = ("exact", "cached", "estimated", "none")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.setup(request):
+            return None
+
+        if self.count_mode != "none":
+            self.set_count(*self.get_count_for_mode(queryset))
+        page_queryset = self.get_page_queryset(queryset)
+        return self.get_page_results(list(page_queryset) if page_queryset is not None else [])
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if not self.setup(request):
+            return None
+
+        if self.count_mode != "none":
+            self.set_count(*await self.aget_count_for_mode(queryset))
+        page_queryset = self.get_page_queryset(queryset)
+        if page_queryset is None:
+            return self.get_page_results([])
+        return self.get_page_results([item async for item in page_queryset])
+
+    def setup(self, request):
+        """Read the pagination query parameters, return False when the list is not paginated."""
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return False
+
+        self.offset = self.get_offset(request)
+        self.count_mode = self.get_count_mode(request)
+        self.count = None
+        self.count_is_estimated = False
+        return True
+
+    def set_count(self, count, count_is_estimated):
+        self.count = count
+        self.count_is_estimated = count_is_estimated
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+    def get_page_queryset(self, queryset):
+        """
+        Return the queryset of the page rows, None when it is known to be empty,
+        and one more row when there is no exact count to know if there is a next page.
+        """
+
+        if self.count is not None and not self.count_is_estimated:
+            if self.count == 0 or self.offset > self.count:
+                return None
+            return queryset[self.offset:self.offset + self.limit]
+        return queryset[self.offset:self.offset + self.limit + 1]
+
+    def get_page_results(self, results):
+        if self.count is not None and not self.count_is_estimated:
+            return results
+        self.has_next = len(results) > self.limit
+        return results[: self.limit]
+
+    def get_paginated_response(self, data):
+        response_data = OrderedDict()
+        if self.count is not None:
+            response_data["count"] = self.count
+        if self.count_is_estimated:
+            response_data["count_is_estimated"] = True
+        response_data["next"] = self.get_next_link()
+        response_data["previous"] = self.get_previous_link()
+        response_data["results"] = data
+        return Response(response_data)
+
+    def get_next_link(self):
+        if self.count is not None and not self.count_is_estimated:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_count_mode(self, request):
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode in self.count_modes:
+            return count_mode
+        return getattr(settings, "PAGINATION_COUNT_MODE", "exact")
+
+    def get_count_for_mode(self, queryset):
+        """Return the (count, count_is_estimated) of the queryset for the count mode."""
+
+        queryset = self.get_count_queryset(queryset)
+        if self.count_mode == "exact":
+            return queryset.count(), False
+        if self.count_mode == "estimated":
+            estimated_count = self.get_estimated_count(queryset)
+            if self.is_estimate_used(estimated_count):
+                return estimated_count, True
+        return self.get_cached_count(queryset), False
+
+    async def aget_count_for_mode(self, queryset):
+        queryset = self.get_count_queryset(queryset)
+        if self.count_mode == "exact":
+            return await queryset.acount(), False
+        if self.count_mode == "estimated":
+            estimated_count = await sync_to_async(self.get_estimated_count)(queryset)
+            if self.is_estimate_used(estimated_count):
+                return estimated_count, True
+        return await self.aget_cached_count(queryset), False
+
+    @staticmethod
+    def get_count_queryset(queryset):
+        queryset = queryset.order_by()
+        # The joins are not needed to count, values() querysets have none.
+        if queryset.query.select_related:
+            queryset = queryset.select_related(None)
+        return queryset
+
+    @staticmethod
+    def is_estimate_used(estimated_count):
+        threshold = getattr(settings, "PAGINATION_COUNT_ESTIMATE_THRESHOLD", 100000)
+        return estimated_count is not None and estimated_count >= threshold
+
+    @staticmethod
+    def get_count_tables(queryset):
+        """Return the tables read by the queryset or None when its cached count cannot be invalidated."""
+
+        tables = get_queryset_tables(queryset)
+        return tables if are_generation_tables(tables) else None
+
+    def get_count_cache_key(self, queryset, generations):
+        """
+        Return the cache key of the count, keyed on the request query parameters rather than
+        on the SQL ones, which can hold the request time (e.g. ExcludePastDateOrderingFilter).
+        """
+
+        pagination_params = (self.limit_query_param, self.offset_query_param, self.count_query_param)
+        filter_params = sorted(
+            (name, values)
+            for name, values in self.request.query_params.lists()
+            if name not in pagination_params
+        )
+        sql, _ = queryset.query.sql_with_params()
+        signature = repr((self.request.path, filter_params, sql, generations))
+        return "count:" + hashlib.md5(signature.encode("utf-8")).hexdigest()
+
+    def get_cached_count(self, queryset):
+        tables = self.get_count_tables(queryset)
+        if tables is None:
+            return queryset.count()
+        return cache.get_or_set(
+            self.get_count_cache_key(queryset, get_generations(*tables)),
+            queryset.count,
+            timeout=getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 300),
+        )
+
+    async def aget_cached_count(self, queryset):
+        tables = self.get_count_tables(queryset)
+        if tables is None:
+            return await queryset.acount()
+        key = self.get_count_cache_key(queryset, await aget_generations(*tables))
+        count = await cache.aget(key)
+        if count is None:
+            count = await queryset.acount()
+            await cache.aset(
+                key, count, timeout=getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 300)
+            )
+        return count
+
+    @staticmethod
+    def get_estimated_count(queryset):
+        """Return the PostgreSQL planner estimate of the queryset rows or None on other databases."""
+
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class LimitOffsetKeysetPagination(CountLimitOffsetPagination):
+    """
+    Count limit offset pagination switching to KeysetPagination with ?pagination=cursor
+    on the views declaring a keyset_ordering.
+    """
+
+    pagination_query_param = "pagination"
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset_pagination(request, view):
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset_pagination(request, view):
+            return await self.keyset_paginator.apaginate_queryset(queryset, request, view)
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def use_keyset_pagination(self, request, view):
+        self.keyset_paginator = None
+        if (
+            getattr(view, "keyset_ordering", None)
+            and request.query_params.get(self.pagination_query_param) == "cursor"
+        ):
+            self.keyset_paginator = self.keyset_pagination_class()
+            self.display_page_controls = False
+        return self.keyset_paginator is not None
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_previous_link()
+        return super().get_previous_link()
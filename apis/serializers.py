@@ -1,15 +1,31 @@
+import inspect
+from collections import Counter
+from types import SimpleNamespace
+
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework.serializers import (
+    BaseSerializer,
     ModelSerializer,
+    ListSerializer,
+    PrimaryKeyRelatedField,
+    RelatedField,
     CharField,
+    Field,
     ValidationError,
     UUIDField,
     CurrentUserDefault,
 )
+from rest_framework.validators import UniqueValidator
 
-from accounts.models import Employee
+from accounts.models import Employee, get_department_group_ids
+from helpers.cache import bump_generation
+from helpers.hashers import hash_passwords
 from locations.models import Location
 from clients.models import Client
 from contracts.models import Contract
@@ -18,6 +34,311 @@ from events.models import Event
 CustomUser = get_user_model()
 
 
+class FieldSelection:
+    """
+    Fields kept in a serializer representation by the ?fields=, ?exclude= and ?expand=
+    comma separated query parameters, nested fields being named with dots (contract.client.siren).
+    When ?expand= is given, only the nested serializers it lists (or selected by ?fields=)
+    are rendered as objects, the other ones are rendered as their primary key.
+    """
+
+    query_params = ("fields", "exclude", "expand")
+
+    def __init__(self, fields=None, exclude=(), expand=None):
+        self.fields = set(fields) if fields is not None else None
+        self.exclude = set(exclude)
+        self.expand = set(expand) if expand is not None else None
+
+    @classmethod
+    def from_request(cls, request):
+        """Return the field selection of a read request or None if it has none."""
+
+        if request is None or request.method not in ("GET", "HEAD"):
+            return None
+        query_params = request.query_params
+        if not any(param in query_params for param in cls.query_params):
+            return None
+
+        def get_names(param):
+            if param not in query_params:
+                return None
+            return [name.strip() for name in query_params[param].split(",") if name.strip()]
+
+        return cls(get_names("fields"), get_names("exclude") or (), get_names("expand"))
+
+    @staticmethod
+    def get_nested_names(names, name):
+        prefix = name + "."
+        return {nested_name[len(prefix):] for nested_name in names if nested_name.startswith(prefix)}
+
+    def keeps(self, name):
+        if name in self.exclude:
+            return False
+        return (
+            self.fields is None
+            or name in self.fields
+            or bool(self.get_nested_names(self.fields, name))
+        )
+
+    def expands(self, name):
+        if self.expand is None or name in self.expand or self.get_nested_names(self.expand, name):
+            return True
+        return self.fields is not None and bool(self.get_nested_names(self.fields, name))
+
+    def nested(self, name):
+        """Return the selection of the fields of the nested serializer name."""
+
+        fields = None
+        if self.fields is not None and name not in self.fields:
+            fields = self.get_nested_names(self.fields, name)
+        expand = None if self.expand is None else self.get_nested_names(self.expand, name)
+        return FieldSelection(fields, self.get_nested_names(self.exclude, name), expand)
+
+
+def add_lookup_prefix(prefix, lookup):
+    if isinstance(lookup, Prefetch):
+        return Prefetch(prefix + lookup.prefetch_through, queryset=lookup.queryset)
+    return prefix + lookup
+
+
+def get_sparse_prefetch(source, model_field, select_related, prefetch_related, only):
+    """Return the Prefetch of a to-many relation loading the related model sparse lookups."""
+
+    if only is not None and model_field.one_to_many:
+        only = [*only, model_field.field.name]
+    queryset = model_field.related_model._default_manager.select_related(
+        *select_related
+    ).prefetch_related(*prefetch_related)
+    if only is not None:
+        queryset = queryset.only(*only)
+    return Prefetch(source, queryset=queryset)
+
+
+class RepresentationStrField(Field):
+    """
+    Read-only {"representation_str": ...} of a related object, its __str__ being computed
+    by the database with the related model get_str_expression() annotated on the serializer
+    queryset (see EagerLoadingSerializerMixin), so that the related object is not loaded.
+    The related object __str__ is used when it is loaded or the queryset is not annotated
+    (nested serializers, saved instances).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def get_annotation_name(source):
+        return f"{source}_str"
+
+    @classmethod
+    def get_annotation(cls, model, source, prefix=""):
+        """Return the (name, expression) annotation of the source relation of the model."""
+
+        related_model = model._meta.get_field(source).related_model
+        return cls.get_annotation_name(prefix + source), related_model.get_str_expression(f"{prefix}{source}__")
+
+    def get_attribute(self, instance):
+        model_field = instance._meta.get_field(self.source)
+        if getattr(instance, model_field.attname) is None:
+            return None
+        annotation_name = self.get_annotation_name(self.source)
+        if annotation_name in instance.__dict__ and not model_field.is_cached(instance):
+            return instance.__dict__[annotation_name]
+        return str(getattr(instance, self.source))
+
+    def to_representation(self, value):
+        return {"representation_str": value}
+
+
+class EagerLoadingSerializerMixin:
+    """
+    Declare the relations read by the serializer representation.
+    select_related_fields are joined and prefetch_related_fields are prefetched
+    by the views querysets to avoid one query per serialized row.
+    Nested serializers declarations are prefixed with their source and merged,
+    so that a whole serializer tree is loaded in a fixed number of queries.
+    The RepresentationStrField labels of the root serializer are annotated on its queryset,
+    the ones of nested serializers join their relation.
+
+    The representation keeps the fields of the request FieldSelection and the views
+    load only their columns and relations (see setup_sparse_loading).
+    source_fields declares the model fields read by the sources which are not model fields.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    source_fields = {}
+
+    @classmethod
+    def get_related_lookups(cls, prefix=""):
+        """Return the (select_related, prefetch_related) lookups of the serializer tree."""
+
+        select_related = [prefix + field for field in cls.select_related_fields]
+        prefetch_related = [prefix + field for field in cls.prefetch_related_fields]
+
+        for field_name, field in cls._declared_fields.items():
+            if isinstance(field, RepresentationStrField) and prefix:
+                select_related.append(prefix + (field.source or field_name))
+            nested = getattr(field, "child", field)
+            if not isinstance(nested, EagerLoadingSerializerMixin):
+                continue
+
+            source = field.source or field_name
+            if source not in cls.select_related_fields + cls.prefetch_related_fields:
+                continue
+
+            nested_select, nested_prefetch = nested.get_related_lookups(
+                prefix + source + "__"
+            )
+            if source in cls.select_related_fields:
+                select_related += nested_select
+                prefetch_related += nested_prefetch
+            else:
+                prefetch_related += nested_select + nested_prefetch
+
+        return select_related, prefetch_related
+
+    @classmethod
+    def get_str_annotations(cls, fields=None):
+        """Return the annotations of the RepresentationStrField of the fields, the declared ones by default."""
+
+        fields = cls._declared_fields if fields is None else fields
+        return dict(
+            RepresentationStrField.get_annotation(cls.Meta.model, field.source or name)
+            for name, field in fields.items()
+            if isinstance(field, RepresentationStrField)
+        )
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related, prefetch_related = cls.get_related_lookups()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        str_annotations = cls.get_str_annotations()
+        if str_annotations:
+            queryset = queryset.annotate(**str_annotations)
+        return queryset
+
+    def is_root(self):
+        parent = self.parent.parent if isinstance(self.parent, ListSerializer) else self.parent
+        return parent is None
+
+    def get_field_selection(self):
+        if not hasattr(self, "_field_selection"):
+            self._field_selection = FieldSelection.from_request(self.context.get("request"))
+        return self._field_selection
+
+    def get_fields(self):
+        """Remove the fields left out by the field selection and collapse the nested serializers not expanded."""
+
+        fields = super().get_fields()
+        selection = self.get_field_selection()
+
+        for name, field in list(fields.items()):
+            if selection is not None and not selection.keeps(name):
+                del fields[name]
+                continue
+
+            many = isinstance(field, ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, (BaseSerializer, RepresentationStrField)):
+                continue
+            if selection is not None and not selection.expands(name):
+                kwargs = {"source": field.source} if field.source not in (None, name) else {}
+                fields[name] = PrimaryKeyRelatedField(read_only=True, many=many, **kwargs)
+            elif isinstance(nested, BaseSerializer):
+                # The nested serializers share the root context, their selection is set here.
+                nested._field_selection = selection.nested(name) if selection else None
+        return fields
+
+    def get_sparse_lookups(self):
+        """
+        Return the (select_related, prefetch_related, only) lookups loading the fields kept
+        by the serializer tree, only being None when a field source is unknown.
+        """
+
+        model = self.Meta.model
+        select_related, prefetch_related = [], []
+        only = {model._meta.pk.name}
+
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            source = field.source
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                if only is not None and source in self.source_fields:
+                    only.update(self.source_fields[source])
+                else:
+                    only = None
+                continue
+
+            nested_select, nested_prefetch, nested_only = self.get_related_sparse_lookups(field, model_field)
+            if model_field.many_to_many or model_field.one_to_many:
+                prefetch_related.append(
+                    get_sparse_prefetch(source, model_field, nested_select, nested_prefetch, nested_only)
+                )
+                continue
+
+            if only is not None:
+                only.add(source)
+            if self.is_joined(field):
+                select_related.append(source)
+                select_related += [f"{source}__{lookup}" for lookup in nested_select]
+                prefetch_related += [add_lookup_prefix(source + "__", lookup) for lookup in nested_prefetch]
+                if only is not None and nested_only is not None:
+                    only.update(f"{source}__{name}" for name in nested_only)
+
+        return select_related, prefetch_related, sorted(only) if only is not None else None
+
+    def is_joined(self, field):
+        """Return True if the field reads the related objects of its source, not only their keys."""
+
+        nested = field.child if isinstance(field, ListSerializer) else field
+        if isinstance(field, RepresentationStrField):
+            return not self.is_root()
+        return isinstance(nested, BaseSerializer) or field.source in (
+            self.select_related_fields + self.prefetch_related_fields
+        )
+
+    def get_related_sparse_lookups(self, field, model_field):
+        """Return the (select_related, prefetch_related, only) lookups of the related model of a field."""
+
+        nested = field.child if isinstance(field, ListSerializer) else field
+        if isinstance(nested, EagerLoadingSerializerMixin):
+            return nested.get_sparse_lookups()
+        if model_field.is_relation and not self.is_joined(field):
+            # Related field rendering the primary keys.
+            return [], [], [model_field.related_model._meta.pk.name]
+        return [], [], None
+
+    def setup_sparse_loading(self, queryset, loaded_fields=()):
+        """
+        Return the queryset loading the columns and relations of the fields kept by the request
+        field selection, the whole serializer tree when there is none.
+        loaded_fields are other fields read from the instances, e.g. by the pagination.
+        """
+
+        if self.get_field_selection() is None:
+            return self.setup_eager_loading(queryset)
+
+        select_related, prefetch_related, only = self.get_sparse_lookups()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only is not None:
+            queryset = queryset.only(*only, *loaded_fields)
+        str_annotations = self.get_str_annotations(self.fields)
+        if str_annotations:
+            queryset = queryset.annotate(**str_annotations)
+        return queryset
+
+
 class CreateCustomUserSerializer(ModelSerializer):
     """Serializer to create a custom user."""
 
@@ -60,7 +381,88 @@ class CreateEmployeeSerializer(ModelSerializer):
         read_only_fields = ("employee_id", "created_at", "updated_at")
 
 
-class CustomUserDetailSerializer(ModelSerializer):
+class BulkCreateEmployeeListSerializer(ListSerializer):
+    """
+    Create the employees of the list with their users in one transaction.
+    The unique fields are checked for all the rows at once, the passwords are hashed
+    by the hashing pool and the users are added to their department group set-wise.
+    """
+
+    unique_fields = (("user", "email"), (None, "employee_number"))
+
+    def to_internal_value(self, data):
+        rows = super().to_internal_value(data)
+        errors = [{} for row in rows]
+
+        for nested, field in self.unique_fields:
+            values = [(row[nested] if nested else row)[field] for row in rows]
+            model = CustomUser if nested else Employee
+            existing = set(
+                model.objects.filter(**{f"{field}__in": values}).values_list(field, flat=True)
+            )
+            counts = Counter(values)
+            for row_errors, value in zip(errors, values):
+                if value in existing or counts[value] > 1:
+                    field_errors = row_errors.setdefault(nested, {}) if nested else row_errors
+                    field_errors[field] = [UniqueValidator.message]
+
+        if any(errors):
+            raise ValidationError(errors)
+        return rows
+
+    def create(self, validated_data):
+        passwords = hash_passwords(row["user"]["password"] for row in validated_data)
+        group_ids = get_department_group_ids()
+        users_groups = CustomUser.groups.through
+
+        with transaction.atomic():
+            users = CustomUser.objects.bulk_create(
+                CustomUser(
+                    email=row["user"]["email"],
+                    password=password,
+                    is_staff=row["department"] == "MANAGEMENT",
+                )
+                for row, password in zip(validated_data, passwords)
+            )
+            employees = Employee.objects.bulk_create(
+                Employee(user=user, **{key: value for key, value in row.items() if key != "user"})
+                for row, user in zip(validated_data, users)
+            )
+            users_groups.objects.bulk_create(
+                users_groups(customuser_id=employee.user_id, group_id=group_ids[employee.department])
+                for employee in employees
+                if group_ids.get(employee.department)
+            )
+
+        # bulk_create does not send the signals invalidating the cached values of the tables.
+        for model in (CustomUser, Employee, users_groups):
+            bump_generation(model._meta.db_table)
+        for employee in employees:
+            employee._loaded_department = employee.department
+        return employees
+
+
+class BulkCreateCustomUserSerializer(CreateCustomUserSerializer):
+    """Custom user of a bulk created employee, its email uniqueness is checked by the list."""
+
+    class Meta(CreateCustomUserSerializer.Meta):
+        extra_kwargs = {"email": {"validators": []}}
+
+    def validate_email(self, value):
+        return CustomUser.objects.normalize_email(value)
+
+
+class BulkCreateEmployeeSerializer(CreateEmployeeSerializer):
+    """Serializer to create Epic Events employees and their users in bulk (many=True only)."""
+
+    user = BulkCreateCustomUserSerializer()
+
+    class Meta(CreateEmployeeSerializer.Meta):
+        list_serializer_class = BulkCreateEmployeeListSerializer
+        extra_kwargs = {"employee_number": {"validators": []}}
+
+
+class CustomUserDetailSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with all custom user informations."""
 
     class Meta:
@@ -69,7 +471,7 @@ class CustomUserDetailSerializer(ModelSerializer):
         read_only_fields = ("user_id", "is_staff", "date_joined")
 
 
-class CustomUserListSerializer(ModelSerializer):
+class CustomUserListSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with minimal informations for other models list."""
 
     class Meta:
@@ -78,9 +480,10 @@ class CustomUserListSerializer(ModelSerializer):
         read_only_fields = ("user_id",)
 
 
-class EmployeeDetailSerializer(ModelSerializer):
+class EmployeeDetailSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with all Epic Events employee informations."""
 
+    select_related_fields = ("user",)
     user = CustomUserDetailSerializer()
 
     class Meta:
@@ -89,9 +492,10 @@ class EmployeeDetailSerializer(ModelSerializer):
         read_only_fields = ("employee_id", "created_at", "updated_at")
 
 
-class EmployeeListSerializer(ModelSerializer):
+class EmployeeListSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with minimal informations for employees list."""
 
+    select_related_fields = ("user",)
     user = CustomUserListSerializer()
 
     class Meta:
@@ -106,22 +510,40 @@ class EmployeeListSerializer(ModelSerializer):
         read_only_fields = ("employee_id",)
 
 
-class LocationDetailSerializer(ModelSerializer):
+class LocationDetailSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with all location informations."""
 
     class Meta:
         model = Location
-        fields = "__all__"
+        exclude = ("fingerprint",)
         read_only_fields = ("location_id",)
 
+    def validate(self, data):
+        """Check that the updated address does not match the fingerprint of another location."""
+
+        if self.instance is not None:
+            address = {
+                field: data.get(field, getattr(self.instance, field))
+                for field in Location.address_fields
+            }
+            if (
+                Location.objects.filter(fingerprint=Location.get_fingerprint(address))
+                .exclude(location_id=self.instance.location_id)
+                .exists()
+            ):
+                raise ValidationError("Ce lieu existe déjà.")
+        return data
 
-class ClientDetailSerializer(ModelSerializer):
+
+class ClientDetailSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """
     Serializer with all client informations including location.
     Assigns the default sales_contact (logged-in user) during creation.
     Update sales_contact (MANAGEMENT ONLY) with updated_sales_contact write_only field.
     """
 
+    select_related_fields = ("sales_contact",)
+    prefetch_related_fields = ("locations",)
     sales_contact = UUIDField(default=CurrentUserDefault())
     updated_sales_contact = UUIDField(write_only=True, required=False)
 
@@ -131,20 +553,10 @@ class ClientDetailSerializer(ModelSerializer):
         read_only_fields = ("client_id", "sales_contact", "created_at", "updated_at")
 
 
-class EmployeeStrSerializer(ModelSerializer):
-    """Serializer with __str__ informations for other models list."""
-
-    representation_str = CharField(source="__str__", read_only=True)
-
-    class Meta:
-        model = Employee
-        fields = ["representation_str"]
-
-
-class ClientListSerializer(ModelSerializer):
+class ClientListSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with minimal informations for clients list."""
 
-    sales_contact = EmployeeStrSerializer()
+    sales_contact = RepresentationStrField()
 
     class Meta:
         model = Client
@@ -160,9 +572,10 @@ class ClientListSerializer(ModelSerializer):
         read_only_fields = ("client_id", "created_at", "updated_at")
 
 
-class ContractDetailSerializer(ModelSerializer):
+class ContractDetailSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with all contract informations."""
 
+    select_related_fields = ("client",)
     client = ClientListSerializer(required=False)
 
     class Meta:
@@ -171,20 +584,10 @@ class ContractDetailSerializer(ModelSerializer):
         read_only_fields = ("contract_id", "client", "created_at", "updated_at")
 
 
-class ClientStrSerializer(ModelSerializer):
-    """Serializer with __str__ information for other models list."""
-
-    representation_str = CharField(source="__str__", read_only=True)
-
-    class Meta:
-        model = Client
-        fields = ["representation_str"]
-
-
-class ContractListSerializer(ModelSerializer):
+class ContractListSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with minimal informations for contracts list."""
 
-    client = ClientStrSerializer()
+    client = RepresentationStrField()
 
     class Meta:
         model = Contract
@@ -200,9 +603,10 @@ class ContractListSerializer(ModelSerializer):
         read_only_fields = ("contract_id", "created_at", "updated_at")
 
 
-class ContractSerializerForEvent(ModelSerializer):
+class ContractSerializerForEvent(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with useful informations for event."""
 
+    select_related_fields = ("client",)
     client = ClientDetailSerializer()
 
     class Meta:
@@ -211,14 +615,16 @@ class ContractSerializerForEvent(ModelSerializer):
         read_only_fields = ("contract_id", "client", "created_at", "updated_at")
 
 
-class EventDetailSerializer(ModelSerializer):
+class EventDetailSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """
     Serializer with all event informations.
     Update support_contact (MANAGEMENT ONLY) with updated_support_contact write_only field.
     """
 
+    select_related_fields = ("contract",)
+    prefetch_related_fields = ("locations",)
     contract = ContractSerializerForEvent(required=False)
-    support_contact = EmployeeStrSerializer(required=False)
+    support_contact = RepresentationStrField()
     updated_support_contact = UUIDField(write_only=True, required=False)
 
     def validate(self, data):
@@ -248,10 +654,11 @@ class EventDetailSerializer(ModelSerializer):
         )
 
 
-class EventListSerializer(ModelSerializer):
+class EventListSerializer(EagerLoadingSerializerMixin, ModelSerializer):
     """Serializer with minimal informations for events list."""
 
-    support_contact = EmployeeStrSerializer()
+    source_fields = {"is_event_over": ("end_date",)}
+    support_contact = RepresentationStrField()
 
     class Meta:
         model = Event
@@ -265,3 +672,142 @@ class EventListSerializer(ModelSerializer):
             "support_contact",
         )
         read_only_fields = ("event_id", "contract", "created_at", "updated_at")
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer building the representation of a list serializer_class
+    straight from values() rows, without instantiating the models and the serializer fields.
+    The serializer fields are compiled once into a map of values() lookups and converters
+    (the fields to_representation), so that the output is the same as serializer_class one.
+    Sources which are not model fields are computed from their serializer source_fields
+    and the RepresentationStrField labels are computed by the database.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def compiled(self):
+        return self.compile(self.serializer_class())
+
+    @property
+    def lookups(self):
+        return self.compiled[0]
+
+    @property
+    def annotations(self):
+        return self.compiled[1]
+
+    def compile(self, serializer, prefix=""):
+        """
+        Return the (lookups, annotations, build) of the serializer,
+        build(row) returning its representation.
+        """
+
+        model = serializer.Meta.model
+        lookups = set()
+        annotations = {}
+        builders = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, ListSerializer):
+                raise ImproperlyConfigured(f"{name}: to-many nested serializers are not supported.")
+
+            lookup = prefix + field.source
+            if isinstance(field, BaseSerializer):
+                nested_lookups, nested_annotations, nested_build = self.compile(field, lookup + "__")
+                lookups.update(nested_lookups)
+                lookups.add(lookup)
+                annotations.update(nested_annotations)
+                builders.append((name, self.get_nested_builder(lookup, nested_build)))
+                continue
+            if isinstance(field, RepresentationStrField):
+                annotation_name, expression = field.get_annotation(model, field.source, prefix)
+                lookups.add(lookup)
+                annotations[annotation_name] = expression
+                builders.append((name, self.get_str_builder(lookup, annotation_name)))
+                continue
+
+            field_lookups, builder = self.compile_field(serializer, name, field, prefix)
+            lookups.update(field_lookups)
+            builders.append((name, builder))
+
+        def build(row):
+            return {name: builder(row) for name, builder in builders}
+
+        return lookups, annotations, build
+
+    def compile_field(self, serializer, name, field, prefix):
+        """Return the (lookups, build) of a field reading the columns of the serializer model."""
+
+        model = serializer.Meta.model
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            columns = getattr(serializer, "source_fields", {}).get(field.source)
+            if columns is None:
+                raise ImproperlyConfigured(f"{name}: the source_fields of {field.source} are not declared.")
+            lookups = [prefix + column for column in columns]
+            return lookups, self.get_source_builder(model, field, prefix, columns)
+
+        if model_field.many_to_many or model_field.one_to_many:
+            raise ImproperlyConfigured(f"{name}: to-many relations are not supported.")
+        # values() returns the primary key of the related fields.
+        to_representation = None if isinstance(field, RelatedField) else field.to_representation
+        return [prefix + field.source], self.get_column_builder(prefix + field.source, to_representation)
+
+    @staticmethod
+    def get_column_builder(lookup, to_representation):
+        if to_representation is None:
+            return lambda row: row[lookup]
+
+        def build(row):
+            value = row[lookup]
+            return None if value is None else to_representation(value)
+
+        return build
+
+    @staticmethod
+    def get_nested_builder(lookup, nested_build):
+        def build(row):
+            return None if row[lookup] is None else nested_build(row)
+
+        return build
+
+    @staticmethod
+    def get_str_builder(lookup, annotation_name):
+        def build(row):
+            return None if row[lookup] is None else {"representation_str": row[annotation_name]}
+
+        return build
+
+    @staticmethod
+    def get_source_builder(model, field, prefix, columns):
+        attribute = inspect.getattr_static(model, field.source)
+        getter = attribute.fget if isinstance(attribute, property) else attribute
+
+        def build(row):
+            value = getter(SimpleNamespace(**{column: row[prefix + column] for column in columns}))
+            return None if value is None else field.to_representation(value)
+
+        return build
+
+    def get_values_queryset(self, queryset, loaded_fields=()):
+        """Return the values() queryset of the rows, with the loaded_fields read by the view."""
+
+        # The labels are annotated by the view queryset setup_eager_loading().
+        annotations = {
+            name: expression
+            for name, expression in self.annotations.items()
+            if name not in queryset.query.annotations
+        }
+        return queryset.select_related(None).prefetch_related(None).annotate(**annotations).values(
+            *self.lookups, *self.annotations, *loaded_fields
+        )
+
+    def to_representation(self, rows):
+        build = self.compiled[2]
+        return [build(row) for row in rows]
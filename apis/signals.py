@@ -0,0 +1,102 @@
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import Employee
+from clients.models import Client
+from contracts.models import Contract
+from events.models import Event
+from helpers.cache import bump_generation, register_generation_tables
+from locations.models import Location
+
+# Columns searched by the TrigramSearchFilter of the list views.
+TRIGRAM_INDEXED_FIELDS = {
+    Client: ["company_name"],
+    Employee: ["last_name", "department"],
+}
+
+
+# Tables of the models whose writes all send a signal. The locations tables are not tracked
+# since their rows are also deleted by fast deletes sending no signal.
+register_generation_tables(*(model._meta.db_table for model in (Employee, Client, Contract, Event)))
+
+
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=Contract)
+@receiver([post_save, post_delete], sender=Event)
+@receiver(post_save, sender=Location)
+def invalidate_cached_queries(sender, **kwargs):
+    """Bump the generation of the saved or deleted model table to invalidate the values cached for it."""
+    bump_generation(sender._meta.db_table)
+
+
+@receiver(m2m_changed, sender=Client.locations.through)
+@receiver(m2m_changed, sender=Event.locations.through)
+def touch_locations_owners(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Update the updated_at of the clients and events whose locations are added or removed,
+    their detail representation (and its ETag and Last-Modified, see apis.mixins) including them.
+    """
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    owner_model = Client if sender is Client.locations.through else Event
+    if not reverse:
+        owner_model.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif pk_set:
+        owner_model.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+    for model in (sender, owner_model):
+        bump_generation(model._meta.db_table)
+
+
+@receiver(post_save, sender=Location)
+def touch_location_owners(sender, instance, created, **kwargs):
+    """
+    Update the updated_at of the clients and events of the edited location.
+    There is no pre_delete receiver to keep the fast deletes of the orphan locations
+    (the ETag of the owners of a deleted location changes with their locations primary keys).
+    """
+
+    if created:
+        return
+    now = timezone.now()
+    for owner_model in (Client, Event):
+        if owner_model.objects.filter(locations=instance).update(updated_at=now):
+            bump_generation(owner_model._meta.db_table)
+
+
+@receiver(post_migrate)
+def create_trigram_indexes(sender, using, verbosity=1, **kwargs):
+    """
+    Create the pg_trgm extension and the GIN trigram indexes of the migrated app searched fields:
+    one on the column for the similarity operators and one on UPPER(column) for icontains lookups.
+    """
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+
+    models = [model for model in TRIGRAM_INDEXED_FIELDS if model._meta.app_label == sender.label]
+    if not models:
+        return
+
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for model in models:
+            table = model._meta.db_table
+            for field_name in TRIGRAM_INDEXED_FIELDS[model]:
+                column = quote_name(model._meta.get_field(field_name).column)
+                index_expressions = {
+                    f"{table}_{field_name}_trgm_idx": column,
+                    f"{table}_{field_name}_upper_trgm_idx": f"(UPPER({column}::text))",
+                }
+                for index_name, expression in index_expressions.items():
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS {quote_name(index_name)} "
+                        f"ON {quote_name(table)} USING gin ({expression} gin_trgm_ops)"
+                    )
+                    if verbosity >= 2:
+                        print(f"Trigram index {index_name} created.")
@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     LogoutAPIView,
     EmployeeListAPIView,
+    EmployeeBulkCreateAPIView,
     EmployeeDetailAPIView,
     ClientListAPIView,
     ClientDetailAPIView,
@@ -25,6 +26,11 @@ urlpatterns = [
     path("logout/", LogoutAPIView.as_view(), name="logout"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("employees/", EmployeeListAPIView.as_view(), name="employees"),
+    path(
+        "employees/bulk/",
+        EmployeeBulkCreateAPIView.as_view(),
+        name="employees_bulk",
+    ),
     path(
         "employees/<uuid:employee_id>/",
         EmployeeDetailAPIView.as_view(),
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.generics import (
@@ -11,9 +13,12 @@ from rest_framework.generics import (
     CreateAPIView,
     RetrieveUpdateAPIView,
 )
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.filters import OrderingFilter
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_simplejwt.tokens import OutstandingToken, BlacklistedToken
 
+from accounts.permissions import IsAdminUser, request_has_perm, request_is_staff
 from clients.permissions import IsSalesContact
 from events.permissions import IsSupportContact
 from helpers.functions import update_sales_contact, update_support_contact
@@ -23,6 +28,7 @@ from locations.models import Location
 from contracts.models import Contract
 from events.models import Event
 from .serializers import (
+    BulkCreateEmployeeSerializer,
     CreateEmployeeSerializer,
     CustomUserDetailSerializer,
     EmployeeListSerializer,
@@ -32,10 +38,22 @@ from .serializers import (
     LocationDetailSerializer,
     ContractListSerializer,
     ContractDetailSerializer,
+    ContractSerializerForEvent,
     EventDetailSerializer,
     EventListSerializer,
+    ValuesSerializer,
+)
+from .filters import ContractFilter, EventFilter, TrigramSearchFilter
+from .mixins import (
+    AsyncListMixin,
+    BulkLocationsCreateMixin,
+    ConditionalDetailMixin,
+    ConditionalListMixin,
+    EagerLoadingMixin,
+    PermissionContextMixin,
+    ResponseCacheMixin,
+    ValuesListMixin,
 )
-from .filters import ContractFilter, EventFilter
 
 CustomUser = get_user_model()
 
@@ -46,21 +64,30 @@ class LogoutAPIView(GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        tokens = OutstandingToken.objects.filter(user_id=request.user.user_id)
-        for token in tokens:
-            t, _ = BlacklistedToken.objects.get_or_create(token=token)
+        tokens = OutstandingToken.objects.filter(
+            user_id=request.user.user_id,
+            expires_at__gt=timezone.now(),
+            blacklistedtoken__isnull=True,
+        )
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id in tokens.values_list("id", flat=True)],
+            ignore_conflicts=True,
+        )
 
         return Response(status=status.HTTP_205_RESET_CONTENT)
 
 
-class EmployeeListAPIView(ListCreateAPIView):
+class EmployeeListAPIView(ConditionalListMixin, ValuesListMixin, EagerLoadingMixin, ListCreateAPIView):
     """Get Epic Events employee list and create employee account with his related user
     if the requesting user IsAuthenticated and is_staff (IsAdminUser)."""
 
     permission_classes = (IsAuthenticated, IsAdminUser)
     serializer_class = EmployeeListSerializer
+    values_serializer = ValuesSerializer(EmployeeListSerializer)
     queryset = Employee.objects.all()
+    filter_backends = (DjangoFilterBackend, TrigramSearchFilter, OrderingFilter)
     search_fields = ["last_name", "department"]
+    keyset_ordering = ("-created_at", "-pk")
 
     def post(self, request, *args, **kwargs):
         serializer = CreateEmployeeSerializer(data=request.data)
@@ -76,7 +103,36 @@ class EmployeeListAPIView(ListCreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class EmployeeDetailAPIView(RetrieveUpdateDestroyAPIView):
+class EmployeeBulkCreateAPIView(GenericAPIView):
+    """
+    Create Epic Events employees with their related users from the "employees" list
+    if the requesting user IsAuthenticated and is_staff (IsAdminUser).
+    Every row is validated before any is created, all of them are created in one transaction.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdminUser)
+    serializer_class = BulkCreateEmployeeSerializer
+
+    def post(self, request, *args, **kwargs):
+        if not isinstance(request.data, dict):
+            return Response(
+                {"detail": "Le corps de la requête doit être un objet contenant la liste employees."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = BulkCreateEmployeeSerializer(
+            data=request.data.get("employees", []),
+            many=True,
+            allow_empty=False,
+            max_length=settings.EMPLOYEES_BULK_CREATE_MAX_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        employees = serializer.save()
+        employees_data = EmployeeDetailSerializer(employees, many=True).data
+
+        return Response(employees_data, status=status.HTTP_201_CREATED)
+
+
+class EmployeeDetailAPIView(ConditionalDetailMixin, EagerLoadingMixin, RetrieveUpdateDestroyAPIView):
     """
     Get Epic Events employee detail with his related user via id.
     Edit employee and their is_active user account and email.
@@ -87,11 +143,13 @@ class EmployeeDetailAPIView(RetrieveUpdateDestroyAPIView):
 
     permission_classes = (IsAuthenticated, IsAdminUser)
     serializer_class = EmployeeDetailSerializer
+    queryset = Employee.objects.all()
 
     def get_object(self):
         employee_id = self.kwargs["employee_id"]
-        obj = get_object_or_404(Employee, employee_id=employee_id)
+        obj = get_object_or_404(self.get_queryset(), employee_id=employee_id)
         self.check_object_permissions(self.request, obj)
+        self.check_object_preconditions(obj)
         return obj
 
     def update(self, request, *args, **kwargs):
@@ -120,7 +178,9 @@ class EmployeeDetailAPIView(RetrieveUpdateDestroyAPIView):
         return Response(serializer.data)
 
 
-class ClientListAPIView(ListCreateAPIView):
+class ClientListAPIView(
+    ConditionalListMixin, ValuesListMixin, AsyncListMixin, EagerLoadingMixin, ListCreateAPIView
+):
     """
     Get Epic Events client list (permission all authenticated employees).
     Create client if the requesting user IsAuthenticated and has add_client permission.
@@ -128,12 +188,15 @@ class ClientListAPIView(ListCreateAPIView):
 
     permission_classes = (IsAuthenticated,)
     serializer_class = ClientListSerializer
+    values_serializer = ValuesSerializer(ClientListSerializer)
     queryset = Client.objects.all()
+    filter_backends = (DjangoFilterBackend, TrigramSearchFilter, OrderingFilter)
     filterset_fields = ["contract_requested"]
     search_fields = ["company_name"]
+    keyset_ordering = ("-created_at", "-pk")
 
     def post(self, request, *args, **kwargs):
-        if request.user.has_perm("clients.add_client"):
+        if request_has_perm(request, "clients.add_client"):
             serializer = ClientDetailSerializer(
                 context={"request": request}, data=request.data
             )
@@ -153,7 +216,7 @@ class ClientListAPIView(ListCreateAPIView):
         )
 
 
-class ClientDetailAPIView(RetrieveUpdateDestroyAPIView):
+class ClientDetailAPIView(ConditionalDetailMixin, EagerLoadingMixin, RetrieveUpdateDestroyAPIView):
     """
     Get Epic Events client detail with their related locations via id.
     Edit client informations (MANAGEMENT and sales_contact) or update sales_contact (MANAGEMENT only).
@@ -164,11 +227,13 @@ class ClientDetailAPIView(RetrieveUpdateDestroyAPIView):
 
     permission_classes = [IsAdminUser | IsAuthenticated & IsSalesContact]
     serializer_class = ClientDetailSerializer
+    queryset = Client.objects.all()
 
     def get_object(self):
         client_id = self.kwargs["client_id"]
-        obj = get_object_or_404(Client, client_id=client_id)
+        obj = get_object_or_404(self.get_queryset(), client_id=client_id)
         self.check_object_permissions(self.request, obj)
+        self.check_object_preconditions(obj)
         return obj
 
     def update(self, request, *args, **kwargs):
@@ -176,7 +241,7 @@ class ClientDetailAPIView(RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         data = request.data
 
-        if request.user.is_staff and "updated_sales_contact" in data:
+        if request_is_staff(request) and "updated_sales_contact" in data:
             updated_sales_contact_id = data["updated_sales_contact"]
             updated_sales_contact = update_sales_contact(
                 instance, updated_sales_contact_id
@@ -207,7 +272,9 @@ class ClientDetailAPIView(RetrieveUpdateDestroyAPIView):
             return self.destroy(request, *args, **kwargs)
 
 
-class ClientLocationsListAPIView(ListCreateAPIView):
+class ClientLocationsListAPIView(
+    PermissionContextMixin, BulkLocationsCreateMixin, ListCreateAPIView
+):
     """
     Get locations client list.
     Create or add location(s) to client.
@@ -219,8 +286,7 @@ class ClientLocationsListAPIView(ListCreateAPIView):
     serializer_class = LocationDetailSerializer
 
     def list(self, request, *args, **kwargs):
-        client_id = kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
+        client = self.get_client()
         queryset = client.locations.all()
 
         page = self.paginate_queryset(queryset)
@@ -232,28 +298,11 @@ class ClientLocationsListAPIView(ListCreateAPIView):
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        client_id = kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
-        locations_data = request.data.get("locations", [])
-        locations_added = []
-
-        for location_data in locations_data:
-            serializer = self.serializer_class(data=location_data)
-
-            if serializer.is_valid(raise_exception=True):
-                location, created = Location.objects.get_or_create(
-                    **serializer.validated_data
-                )
-                client.locations.add(location)
-                locations_added.append(location)
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        client = self.get_client()
+        return self.add_locations(client, request.data.get("locations", []))
 
-        locations_serializer = LocationDetailSerializer(locations_added, many=True)
-        return Response(data=locations_serializer.data, status=status.HTTP_201_CREATED)
 
-
-class ClientLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
+class ClientLocationDetailAPIView(PermissionContextMixin, RetrieveUpdateDestroyAPIView):
     """
     Get client location detail.
     Edit and delete location if it is not in use by another client or event or remove it.
@@ -265,8 +314,7 @@ class ClientLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
     serializer_class = LocationDetailSerializer
 
     def get_object(self):
-        client_id = self.kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
+        client = self.get_client()
         location_id = self.kwargs["location_id"]
         obj = get_object_or_404(Location, location_id=location_id)
         self.check_object_permissions(self.request, client)
@@ -298,15 +346,14 @@ class ClientLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
             and instance.event_locations.count() == 0
         ):
             return self.destroy(request, *args, **kwargs)
-        client_id = kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
+        client = self.get_client()
         client.locations.remove(instance.location_id)
         return Response(
             {"details": "Le lieu a été retiré de ce client."}, status=status.HTTP_200_OK
         )
 
 
-class ClientContractsListAPIView(ListCreateAPIView):
+class ClientContractsListAPIView(ConditionalListMixin, PermissionContextMixin, ListCreateAPIView):
     """
     Get contracts client list (permission authenticated IsAdminUser or IsSalesContact).
     Create contract if the requesting user IsAdminUser and if contract_requested client field is True.
@@ -317,7 +364,9 @@ class ClientContractsListAPIView(ListCreateAPIView):
 
     def list(self, request, *args, **kwargs):
         client_id = kwargs["client_id"]
-        queryset = Contract.objects.filter(client_id=client_id)
+        queryset = self.get_serializer().setup_sparse_loading(
+            Contract.objects.filter(client_id=client_id)
+        )
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -328,9 +377,8 @@ class ClientContractsListAPIView(ListCreateAPIView):
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if request.user.is_staff:
-            client_id = kwargs["client_id"]
-            client = get_object_or_404(Client, client_id=client_id)
+        if request_is_staff(request):
+            client = self.get_client()
 
             if client.contract_requested:
                 serializer = ContractDetailSerializer(data=request.data)
@@ -358,7 +406,9 @@ class ClientContractsListAPIView(ListCreateAPIView):
         )
 
 
-class ClientContractDetailAPIView(RetrieveUpdateDestroyAPIView):
+class ClientContractDetailAPIView(
+    ConditionalDetailMixin, PermissionContextMixin, EagerLoadingMixin, RetrieveUpdateDestroyAPIView
+):
     """
     Get and update client contract.
     Delete contract if it is not signed.
@@ -368,13 +418,14 @@ class ClientContractDetailAPIView(RetrieveUpdateDestroyAPIView):
 
     permission_classes = [IsAdminUser | IsAuthenticated & IsSalesContact]
     serializer_class = ContractDetailSerializer
+    queryset = Contract.objects.all()
 
     def get_object(self):
-        client_id = self.kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
+        client = self.get_client()
         contract_id = self.kwargs["contract_id"]
-        obj = get_object_or_404(Contract, contract_id=contract_id)
+        obj = get_object_or_404(self.get_queryset(), contract_id=contract_id)
         self.check_object_permissions(self.request, client)
+        self.check_object_preconditions(obj)
         return obj
 
     def delete(self, request, *args, **kwargs):
@@ -387,7 +438,7 @@ class ClientContractDetailAPIView(RetrieveUpdateDestroyAPIView):
         )
 
 
-class ClientContractEventCreateAPIView(CreateAPIView):
+class ClientContractEventCreateAPIView(PermissionContextMixin, CreateAPIView):
     """Create an event for the client contract if the requesting user is client sales_contact
     and the contract is_signed."""
 
@@ -395,10 +446,12 @@ class ClientContractEventCreateAPIView(CreateAPIView):
     serializer_class = EventDetailSerializer
 
     def get_object(self):
-        client_id = self.kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
+        client = self.get_client()
         contract_id = self.kwargs["contract_id"]
-        obj = get_object_or_404(Contract, contract_id=contract_id)
+        obj = get_object_or_404(
+            ContractSerializerForEvent.setup_eager_loading(Contract.objects.all()),
+            contract_id=contract_id,
+        )
         self.check_object_permissions(self.request, client)
         return obj
 
@@ -409,12 +462,9 @@ class ClientContractEventCreateAPIView(CreateAPIView):
             serializer = self.serializer_class(data=request.data)
 
             if serializer.is_valid(raise_exception=True):
-                contract_id = self.kwargs["contract_id"]
-                contract = get_object_or_404(Contract, contract_id=contract_id)
-
                 try:
                     event = Event.objects.create(
-                        contract=contract, **serializer.validated_data
+                        contract=instance, **serializer.validated_data
                     )
                     event_data = self.serializer_class(event).data
                     return Response(event_data, status=status.HTTP_201_CREATED)
@@ -430,7 +480,9 @@ class ClientContractEventCreateAPIView(CreateAPIView):
         )
 
 
-class ClientContractEventDetailAPIView(RetrieveUpdateAPIView):
+class ClientContractEventDetailAPIView(
+    ConditionalDetailMixin, PermissionContextMixin, EagerLoadingMixin, RetrieveUpdateAPIView
+):
     """
     Get client contract event.
     Update or delete event if it is not over.
@@ -440,11 +492,19 @@ class ClientContractEventDetailAPIView(RetrieveUpdateAPIView):
 
     permission_classes = [IsAdminUser | IsAuthenticated & IsSupportContact]
     serializer_class = EventDetailSerializer
+    queryset = Event.objects.all()
+
+    def get_loaded_fields(self):
+        # The support_contact is read by IsSupportContact, whatever the field selection.
+        return super().get_loaded_fields() + ["support_contact"]
+
+    def get_context_querysets(self):
+        return {Event: self.get_queryset().select_related("support_contact")}
 
     def get_object(self):
-        event_id = self.kwargs["event_id"]
-        obj = get_object_or_404(Event, event_id=event_id)
+        obj = self.get_event()
         self.check_object_permissions(self.request, obj)
+        self.check_object_preconditions(obj)
         return obj
 
     def update(self, request, *args, **kwargs):
@@ -452,7 +512,7 @@ class ClientContractEventDetailAPIView(RetrieveUpdateAPIView):
         instance = self.get_object()
         data = request.data
 
-        if request.user.is_staff and "updated_support_contact" in data:
+        if request_is_staff(request) and "updated_support_contact" in data:
             updated_support_contact_id = data["updated_support_contact"]
             updated_support_contact = update_support_contact(
                 instance, updated_support_contact_id
@@ -471,7 +531,9 @@ class ClientContractEventDetailAPIView(RetrieveUpdateAPIView):
             return Response(serializer.data)
 
 
-class EventLocationsListAPIView(ListCreateAPIView):
+class EventLocationsListAPIView(
+    PermissionContextMixin, BulkLocationsCreateMixin, ListCreateAPIView
+):
     """
     Get event locations list.
     Create or add location(s) to event.
@@ -483,8 +545,7 @@ class EventLocationsListAPIView(ListCreateAPIView):
     serializer_class = LocationDetailSerializer
 
     def list(self, request, *args, **kwargs):
-        event_id = kwargs["event_id"]
-        event = get_object_or_404(Event, event_id=event_id)
+        event = self.get_event()
         queryset = event.locations.all()
 
         page = self.paginate_queryset(queryset)
@@ -496,28 +557,11 @@ class EventLocationsListAPIView(ListCreateAPIView):
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        event_id = kwargs["event_id"]
-        event = get_object_or_404(Event, event_id=event_id)
-        locations_data = request.data.get("locations", [])
-        locations_added = []
-
-        for location_data in locations_data:
-            serializer = self.serializer_class(data=location_data)
-
-            if serializer.is_valid(raise_exception=True):
-                location, created = Location.objects.get_or_create(
-                    **serializer.validated_data
-                )
-                event.locations.add(location)
-                locations_added.append(location)
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        event = self.get_event()
+        return self.add_locations(event, request.data.get("locations", []))
 
-        locations_serializer = LocationDetailSerializer(locations_added, many=True)
-        return Response(data=locations_serializer.data, status=status.HTTP_201_CREATED)
 
-
-class EventLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
+class EventLocationDetailAPIView(PermissionContextMixin, RetrieveUpdateDestroyAPIView):
     """
     Get event location detail.
     Edit and delete location if it is not in use by another client or event or remove it.
@@ -529,8 +573,7 @@ class EventLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
     serializer_class = LocationDetailSerializer
 
     def get_object(self):
-        event_id = self.kwargs["event_id"]
-        event = get_object_or_404(Event, event_id=event_id)
+        event = self.get_event()
         location_id = self.kwargs["location_id"]
         obj = get_object_or_404(Location, location_id=location_id)
         self.check_object_permissions(self.request, event)
@@ -562,8 +605,7 @@ class EventLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
             and instance.event_locations.count() == 1
         ):
             return self.destroy(request, *args, **kwargs)
-        event_id = self.kwargs["event_id"]
-        event = get_object_or_404(Event, event_id=event_id)
+        event = self.get_event()
         event.locations.remove(instance.location_id)
         return Response(
             {"details": "Le lieu a été retiré de cet événement."},
@@ -571,19 +613,39 @@ class EventLocationDetailAPIView(RetrieveUpdateDestroyAPIView):
         )
 
 
-class ContractListAPIView(ListAPIView):
-    """Get all contracts list."""
+class ContractListAPIView(
+    ResponseCacheMixin,
+    ConditionalListMixin,
+    ValuesListMixin,
+    AsyncListMixin,
+    EagerLoadingMixin,
+    ListAPIView,
+):
+    """Get all contracts list, cached until a contract, client or employee is saved or deleted."""
 
     permission_classes = (IsAuthenticated,)
     serializer_class = ContractListSerializer
+    values_serializer = ValuesSerializer(ContractListSerializer)
     queryset = Contract.objects.all()
     filterset_class = ContractFilter
+    keyset_ordering = ("-created_at", "-pk")
+    response_cache_models = (Contract, Client, Employee)
 
 
-class EventListAPIView(ListAPIView):
-    """Get all events list."""
+class EventListAPIView(
+    ResponseCacheMixin,
+    ConditionalListMixin,
+    ValuesListMixin,
+    AsyncListMixin,
+    EagerLoadingMixin,
+    ListAPIView,
+):
+    """Get all events list, cached until an event or employee is saved or deleted."""
 
     permission_classes = (IsAuthenticated,)
     serializer_class = EventListSerializer
+    values_serializer = ValuesSerializer(EventListSerializer)
     queryset = Event.objects.all()
     filterset_class = EventFilter
+    keyset_ordering = ("start_date", "pk")
+    response_cache_models = (Event, Employee)
@@ -2,6 +2,8 @@ import uuid
 from phonenumber_field.modelfields import PhoneNumberField
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 
@@ -53,10 +55,33 @@ class Client(TimestampedModel):
 
     class Meta:
         ordering = ["company_name"]
+        indexes = [
+            models.Index(fields=["company_name", "client_id"], name="client_company_name_idx"),
+            models.Index(
+                fields=["company_name"],
+                name="client_contract_requested_idx",
+                condition=models.Q(contract_requested=True),
+            ),
+            models.Index(fields=["-created_at", "-client_id"], name="client_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"Client {self.last_name} {self.first_name} de la société {self.company_name}"
 
+    @staticmethod
+    def get_str_expression(prefix=""):
+        """Return the database expression of __str__, prefix being the lookup of the client relation."""
+
+        return Concat(
+            Value("Client "),
+            F(f"{prefix}last_name"),
+            Value(" "),
+            F(f"{prefix}first_name"),
+            Value(" de la société "),
+            F(f"{prefix}company_name"),
+            output_field=models.CharField(),
+        )
+
     def clean(self):
         """Raise error if sales_contact department is not SALES."""
         if not self.sales_contact.department == "SALES":
@@ -71,10 +96,4 @@ class Client(TimestampedModel):
 @receiver(pre_delete, sender=Client)
 def delete_linked_locations(sender, instance, **kwargs):
     """Delete client locations if they are not used by other clients or events."""
-    locations = instance.locations.all()
-    for location in locations:
-        if (
-            location.client_locations.count() == 1
-            and location.event_locations.count() == 0
-        ):
-            location.delete()
+    instance.locations.orphans(ignored_clients=[instance]).delete()
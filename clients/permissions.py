@@ -1,22 +1,19 @@
-from django.shortcuts import get_object_or_404
 from rest_framework.permissions import BasePermission
-from clients.models import Client
+
+from helpers.context import get_permission_context
 
 
 class IsSalesContact(BasePermission):
     """Grant access to client sales contact."""
 
     def has_permission(self, request, view):
-        client_id = view.kwargs["client_id"]
-        client = get_object_or_404(Client, client_id=client_id)
+        context = get_permission_context(request)
+        client = context.get_client(view.kwargs["client_id"])
 
         if request.user.is_superuser:
             return True
 
-        if request.user.employee == client.sales_contact:
-            return True
-
-        return False
+        return context.is_contact(client.sales_contact)
 
     def has_object_permission(self, request, view, obj):
-        return obj.sales_contact == request.user.employee
+        return get_permission_context(request).is_contact(obj.sales_contact)
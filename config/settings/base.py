@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # 3rd party
     "rest_framework",
     "corsheaders",
@@ -119,6 +120,27 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # https://docs.djangoproject.com/fr/4.1/topics/auth/customizing/
 AUTH_USER_MODEL = "accounts.CustomUser"
 
+AUTHENTICATION_BACKENDS = ["accounts.backends.CachedPermissionsBackend"]
+
+# Password hashers, the PASSWORD_HASHER one hashes the new passwords and the existing hashes
+# are updated to it on login (see accounts.hashers, the argon2 one requires argon2-cffi)
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "accounts.hashers.ScryptPasswordHasher")
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher
+    for hasher in (
+        "accounts.hashers.ScryptPasswordHasher",
+        "accounts.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    )
+    if hasher != PASSWORD_HASHER
+]
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get("PASSWORD_SCRYPT_WORK_FACTOR", 2**14))
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 19456
+# Threads verifying the login passwords of each process, 0 to verify them in the request thread
+PASSWORD_VERIFICATION_WORKERS = int(os.environ.get("PASSWORD_VERIFICATION_WORKERS", 2))
+
 
 # Whitelist of origins that are authorized to make cross-site HTTP requests
 CORS_ALLOWED_ORIGINS = (os.environ.get("CORS_ALLOWED_ORIGINS"),)
@@ -127,13 +149,23 @@ CSRF_TRUSTED_ORIGINS = [os.environ.get("CSRF_TRUSTED_ORIGINS")]
 
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "apis.pagination.LimitOffsetKeysetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
+    ),
+    # orjson encoding and decoding when installed (see apis.renderers)
+    "DEFAULT_RENDERER_CLASSES": (
+        "apis.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apis.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -142,6 +174,48 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Local memory cache of each process, or Redis cache shared by the processes with REDIS_CACHE_URL.
+# It keeps the tables generation counters invalidating the cached values (see helpers.cache).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if os.environ.get("REDIS_CACHE_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_CACHE_URL"),
+    }
+
+# Cached responses of the contracts and events lists (see apis.mixins.ResponseCacheMixin)
+LIST_RESPONSE_CACHE_ALIAS = os.environ.get("LIST_RESPONSE_CACHE_ALIAS", "default")
+LIST_RESPONSE_CACHE_TIMEOUT = 60
+
+# Count of paginated lists: exact, cached, estimated or none (see apis.pagination).
+# The counts are only cached by default when the processes share the cache.
+PAGINATION_COUNT_MODE = os.environ.get(
+    "PAGINATION_COUNT_MODE", "cached" if os.environ.get("REDIS_CACHE_URL") else "exact"
+)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 100000
+PAGINATION_COUNT_CACHE_TIMEOUT = 300
+
+# Authenticated users snapshots (see accounts.authentication), shared between processes
+# through the JWT_USER_CACHE_ALIAS cache when set
+JWT_USER_CACHE_MAX_SIZE = 1024
+JWT_USER_CACHE_TIMEOUT = 60
+JWT_USER_CACHE_ALIAS = os.environ.get("JWT_USER_CACHE_ALIAS")
+
+# Seconds the groups and users permissions are kept by each process (see accounts.backends),
+# bounding how long a change missed through a local memory cache is ignored by the other processes
+PERMISSIONS_CACHE_TIMEOUT = 5
+
+# Processes hashing the passwords of the bulk created employees (see helpers.hashers),
+# started by each server process: keep it small when the server runs several processes
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get("PASSWORD_HASHING_WORKERS", min(2, os.cpu_count() or 1))
+)
+EMPLOYEES_BULK_CREATE_MAX_SIZE = 500
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
@@ -155,6 +229,8 @@ SIMPLE_JWT = {
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
     "USER_ID_FIELD": "user_id",
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.tokens.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.tokens.ClaimsTokenRefreshSerializer",
 }
 
 sentry_sdk.init(
@@ -10,6 +10,8 @@ from tests.factories import (
     SupportContactFactory,
     EventFactory,
 )
+from django.core.cache import cache
+from accounts.authentication import local_user_cache
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -23,6 +25,16 @@ register(SupportContactFactory)
 register(EventFactory)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear the caches between tests as the database rollback does not invalidate them."""
+    cache.clear()
+    local_user_cache.clear()
+    yield
+    cache.clear()
+    local_user_cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
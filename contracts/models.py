@@ -27,6 +27,19 @@ class Contract(TimestampedModel):
 
     class Meta:
         ordering = ["is_signed"]
+        indexes = [
+            models.Index(
+                fields=["is_signed", "-created_at"], name="contract_signed_created_idx"
+            ),
+            models.Index(
+                fields=["payment_due"],
+                name="contract_payment_due_idx",
+                condition=models.Q(payment_due__gt=0),
+            ),
+            models.Index(
+                fields=["-created_at", "-contract_id"], name="contract_keyset_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Contrat du client {self.client}"
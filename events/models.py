@@ -45,6 +45,11 @@ class Event(TimestampedModel):
         Location, related_name="event_locations", blank=True
     )
 
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            models.Index(fields=["start_date", "event_id"], name="event_start_date_idx"),
+        ]
+
     @property
     def is_event_over(self):
         """Return True if events is over."""
@@ -71,8 +76,4 @@ géré par {self.support_contact}"
 @receiver(pre_delete, sender=Event)
 def delete_linked_locations(sender, instance, **kwargs):
     """Delete event locations if they are not used by other clients or events."""
-    locations = instance.locations.all()
-    for location in locations:
-        if location.event_locations.count() == 1:
-            if location.client_locations.count() == 0:
-                location.delete()
+    instance.locations.orphans(ignored_events=[instance]).delete()
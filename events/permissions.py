@@ -1,22 +1,19 @@
-from django.shortcuts import get_object_or_404
 from rest_framework.permissions import BasePermission
-from events.models import Event
+
+from helpers.context import get_permission_context
 
 
 class IsSupportContact(BasePermission):
     """Grant access to event support contact."""
 
     def has_permission(self, request, view):
-        event_id = view.kwargs["event_id"]
-        event = get_object_or_404(Event, event_id=event_id)
+        context = get_permission_context(request)
+        event = context.get_event(view.kwargs["event_id"])
 
         if request.user.is_superuser:
             return True
 
-        if request.user.employee == event.support_contact:
-            return True
-
-        return False
+        return context.is_contact(event.support_contact)
 
     def has_object_permission(self, request, view, obj):
-        return obj.support_contact == request.user.employee
+        return get_permission_context(request).is_contact(obj.support_contact)
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+# Tables whose writes all bump their generation (see register_generation_tables).
+generation_tables = set()
+
+
+def get_generation_key(table):
+    return f"generation:{table}"
+
+
+def get_generations(*tables):
+    """
+    Return the generation counters of the database tables.
+    A missing counter is initialized with the current time so that values cached
+    before an eviction can never be reused.
+    """
+
+    keys = [get_generation_key(table) for table in tables]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns())
+            generations[key] = cache.get(key)
+    return tuple(generations[key] for key in keys)
+
+
+async def aget_generations(*tables):
+    """Return the generation counters of the database tables through the async cache API (see get_generations)."""
+
+    keys = [get_generation_key(table) for table in tables]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            await cache.aadd(key, time.time_ns())
+            generations[key] = await cache.aget(key)
+    return tuple(generations[key] for key in keys)
+
+
+def bump_generation(table):
+    """Invalidate the values cached for the database table."""
+
+    try:
+        cache.incr(get_generation_key(table))
+    except ValueError:
+        cache.set(get_generation_key(table), time.time_ns(), timeout=None)
+
+
+async def aincr_counter(cache, key):
+    """Increment the counter of the cache key, created without expiration."""
+
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+def register_generation_tables(*tables):
+    """
+    Declare database tables whose every write bumps their generation, so that the values
+    cached for queries on them can be invalidated by their generations only.
+    Writes sending no signal (update(), bulk_create(), fast deletes) must bump it themselves.
+    """
+
+    generation_tables.update(tables)
+
+
+def are_generation_tables(tables):
+    return set(tables) <= generation_tables
+
+
+def get_queryset_tables(queryset):
+    """Return the database tables read by the queryset filters."""
+
+    query = queryset.query
+    tables = {queryset.model._meta.db_table}
+    tables.update(join.table_name for join in query.alias_map.values())
+    return sorted(tables)
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache keeping the max_size most recently used values
+    for timeout seconds.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.values = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                expires_at, value = self.values[key]
+            except KeyError:
+                return default
+            if expires_at <= time.monotonic():
+                del self.values[key]
+                return default
+            self.values.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.values[key] = (time.monotonic() + self.timeout, value)
+            self.values.move_to_end(key)
+            while len(self.values) > self.max_size:
+                self.values.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.values.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
@@ -0,0 +1,48 @@
+from django.shortcuts import get_object_or_404
+
+from clients.models import Client
+from events.models import Event
+
+
+class PermissionContext:
+    """
+    Objects of a request loaded once and shared by the permissions checks and the view.
+    The client and event contacts are joined so that checking the requesting user
+    against them does not run any other query.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.querysets = {
+            Client: Client.objects.select_related("sales_contact"),
+            Event: Event.objects.select_related("support_contact"),
+        }
+        self.objects = {}
+
+    def get_object(self, model, pk):
+        """Return the model instance of primary key pk or raise Http404, querying it once per request."""
+
+        key = (model, str(pk))
+        if key not in self.objects:
+            self.objects[key] = get_object_or_404(self.querysets[model], pk=pk)
+        return self.objects[key]
+
+    def get_client(self, client_id):
+        return self.get_object(Client, client_id)
+
+    def get_event(self, event_id):
+        return self.get_object(Event, event_id)
+
+    def is_contact(self, contact):
+        """Return True if the contact employee is the requesting user employee."""
+
+        return contact is not None and contact.user_id == self.request.user.pk
+
+
+def get_permission_context(request):
+    """Return the permission context of the request, created on first use."""
+
+    context = getattr(request, "permission_context", None)
+    if context is None:
+        context = request.permission_context = PermissionContext(request)
+    return context
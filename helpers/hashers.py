@@ -0,0 +1,116 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+hashing_pool = None
+hashing_pool_lock = threading.Lock()
+verification_pool = None
+verification_pool_lock = threading.Lock()
+
+
+def get_hashing_workers():
+    return getattr(settings, "PASSWORD_HASHING_WORKERS", 1)
+
+
+def get_hashing_pool():
+    """
+    Return the process pool hashing the passwords, started on first use and kept by the process
+    until PASSWORD_HASHING_WORKERS changes or the process exits.
+    The workers are spawned rather than forked to be safe in threaded servers.
+    """
+
+    global hashing_pool
+    workers = get_hashing_workers()
+    with hashing_pool_lock:
+        if hashing_pool is not None and hashing_pool._max_workers != workers:
+            hashing_pool.shutdown(wait=False)
+            hashing_pool = None
+        if hashing_pool is None:
+            hashing_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return hashing_pool
+
+
+@atexit.register
+def shutdown_pools():
+    """Stop the hashing processes and the verification threads, waiting for the running tasks."""
+
+    global hashing_pool, verification_pool
+    with hashing_pool_lock:
+        if hashing_pool is not None:
+            hashing_pool.shutdown()
+            hashing_pool = None
+    with verification_pool_lock:
+        if verification_pool is not None:
+            verification_pool.shutdown()
+            verification_pool = None
+
+
+@receiver(setting_changed)
+def shutdown_pools_on_setting_change(setting, **kwargs):
+    if setting in ("PASSWORD_HASHING_WORKERS", "PASSWORD_VERIFICATION_WORKERS"):
+        shutdown_pools()
+
+
+def hash_passwords(passwords):
+    """
+    Return the hashes of the passwords, computed by the PASSWORD_HASHING_WORKERS processes
+    of the hashing pool when there are several, in the current process otherwise.
+    """
+
+    passwords = list(passwords)
+    workers = get_hashing_workers()
+    if workers < 2 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(get_hashing_pool().map(make_password, passwords, chunksize=chunksize))
+
+
+def get_verification_pool():
+    """
+    Return the thread pool verifying the login passwords or None when PASSWORD_VERIFICATION_WORKERS is 0.
+    The hashers release the GIL while hashing, so the pool bounds the CPU used by the logins
+    and the other requests of the process are not starved by a burst of them.
+    """
+
+    global verification_pool
+    workers = getattr(settings, "PASSWORD_VERIFICATION_WORKERS", 0)
+    if not workers:
+        return None
+    with verification_pool_lock:
+        if verification_pool is not None and verification_pool._max_workers != workers:
+            verification_pool.shutdown(wait=False)
+            verification_pool = None
+        if verification_pool is None:
+            verification_pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password_verification"
+            )
+        return verification_pool
+
+
+def verify_password(password, encoded, setter=None):
+    """
+    Return whether the password matches the encoded hash, checked in the verification pool.
+    When the hash must be updated to the preferred hasher or its parameters, the new hash is
+    also computed in the pool and the setter is called with it.
+    """
+
+    pool = get_verification_pool()
+    if pool is None:
+        return check_password(password, encoded, setter and (lambda raw: setter(make_password(raw))))
+
+    rehashed = []
+    is_correct = pool.submit(
+        check_password, password, encoded, lambda raw: rehashed.append(make_password(raw))
+    ).result()
+    if setter and rehashed:
+        setter(rehashed[0])
+    return is_correct
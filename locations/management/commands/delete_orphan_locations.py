@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from locations.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the locations used by no client and no event. "
+        "Meant to be run periodically, e.g. from a cron job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = Location.objects.delete_orphans(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} orphan location(s) deleted."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from locations.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the address fingerprint of the locations created before it existed, "
+        "merging the locations with the same address into one. "
+        "Meant to be run once after the migration adding the fingerprint column."
+    )
+
+    def handle(self, *args, **options):
+        filled, merged = Location.objects.fill_fingerprints()
+        self.stdout.write(
+            self.style.SUCCESS(f"{filled} location(s) fingerprinted, {merged} duplicate location(s) merged.")
+        )
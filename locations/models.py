@@ -1,5 +1,10 @@
+import hashlib
+import unicodedata
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
 
 from helpers.validators import (
     unicodealphavalidator,
@@ -8,6 +13,72 @@ from helpers.validators import (
 )
 
 
+class LocationQuerySet(models.QuerySet):
+    def orphans(self, ignored_clients=(), ignored_events=()):
+        """
+        Return the locations used by no client and no event in a single query,
+        the links to the ignored clients and events (being deleted) not being counted.
+        """
+
+        client_links = self.model.client_locations.through.objects.filter(
+            location=OuterRef("pk")
+        ).exclude(client__in=ignored_clients)
+        event_links = self.model.event_locations.through.objects.filter(
+            location=OuterRef("pk")
+        ).exclude(event__in=ignored_events)
+        return self.filter(~Exists(client_links), ~Exists(event_links))
+
+    def delete_orphans(self, batch_size=1000):
+        """
+        Delete the orphan locations by batches of primary keys and return their number.
+        Each batch is filtered again so that a location linked meanwhile is kept.
+        """
+
+        deleted = 0
+        while True:
+            batch = list(self.orphans().values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            _, deleted_by_model = self.filter(pk__in=batch).orphans().delete()
+            deleted += deleted_by_model.get(self.model._meta.label, 0)
+            if len(batch) < batch_size:
+                return deleted
+
+    def fill_fingerprints(self):
+        """
+        Set the fingerprint of the locations saved without one (before the column existed),
+        merging each location into the one with the same fingerprint, if any:
+        its clients and events links are moved to it and it is deleted.
+        Return the numbers of locations fingerprinted and merged.
+        """
+
+        filled = merged = 0
+        links = [
+            (self.model.client_locations.through, "client_id"),
+            (self.model.event_locations.through, "event_id"),
+        ]
+        with transaction.atomic(using=self.db):
+            fingerprints = dict(
+                self.exclude(Q(fingerprint__isnull=True) | Q(fingerprint="")).values_list("fingerprint", "pk")
+            )
+            for location in self.filter(Q(fingerprint__isnull=True) | Q(fingerprint="")).order_by("pk"):
+                fingerprint = self.model.get_fingerprint(location)
+                kept_id = fingerprints.get(fingerprint)
+                if kept_id is None:
+                    location.save(update_fields=["fingerprint"])
+                    fingerprints[fingerprint] = location.pk
+                    filled += 1
+                    continue
+                for through, owner_field in links:
+                    kept_owners = through.objects.filter(location_id=kept_id).values(owner_field)
+                    through.objects.filter(location_id=location.pk).exclude(
+                        **{f"{owner_field}__in": kept_owners}
+                    ).update(location_id=kept_id)
+                self.filter(pk=location.pk).delete()
+                merged += 1
+        return filled, merged
+
+
 class Location(models.Model):
     """Location of companies and events."""
 
@@ -25,9 +96,50 @@ class Location(models.Model):
     country = models.CharField(
         "Nom du pays", max_length=100, validators=[unicodealphavalidator]
     )
+    # Nullable so that the column can be added to the existing rows, filled by fill_location_fingerprints.
+    fingerprint = models.CharField(
+        "Empreinte de l'adresse", max_length=64, unique=True, null=True, editable=False
+    )
+
+    objects = LocationQuerySet.as_manager()
+
+    address_fields = ("street_number", "street_name", "city", "zip_code", "country")
 
     class Meta:
         ordering = ["zip_code"]
 
+    @classmethod
+    def get_fingerprint(cls, address):
+        """
+        Return the sha256 of the normalized address fields (mapping or Location):
+        unicode compatibility form, case folded and whitespace collapsed,
+        so that addresses only differing by their casing or spaces share the same fingerprint.
+        """
+
+        values = []
+        for field in cls.address_fields:
+            if isinstance(address, Location):
+                value = getattr(address, field)
+            else:
+                value = address.get(field)
+            value = unicodedata.normalize("NFKC", "" if value is None else str(value)).casefold()
+            values.append(" ".join(value.split()))
+        return hashlib.sha256("|".join(values).encode("utf-8")).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.get_fingerprint(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & set(self.address_fields):
+            kwargs["update_fields"] = {*update_fields, "fingerprint"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.street_number} {self.street_name}, {self.zip_code}, {self.city} - {self.country}"
+
+
+@receiver(pre_save, sender=Location)
+def set_raw_location_fingerprint(sender, instance, raw, **kwargs):
+    """Set the fingerprint of the locations loaded from fixtures, saved without calling save()."""
+
+    if raw:
+        instance.fingerprint = Location.get_fingerprint(instance)
@@ -1,7 +1,21 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import (
+    BlacklistedToken,
+    OutstandingToken,
+    RefreshToken,
+)
 from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.tokens import ClaimsRefreshToken
 
 
 CustomUser = get_user_model()
@@ -30,6 +44,43 @@ class TestLogin(APITestCase):
         assert "access" in response.data
         assert "refresh" in response.data
 
+    def test_login_route_access_token_embeds_user_claims(self):
+        """
+        GIVEN existing user data for login
+        WHEN the login endpoint is posted to (POST)
+        THEN checks that the access token embeds the user claims and the refresh token does not
+        """
+        data = {"email": "testloginuser@email.com", "password": "123456789!"}
+        response = self.client.post(self.url, data=data)
+        access_token = AccessToken(response.data["access"])
+        assert access_token["employee_id"] is None
+        assert access_token["department"] is None
+        assert access_token["is_staff"] is False
+        assert access_token["permissions"] == []
+        assert "permissions" not in RefreshToken(response.data["refresh"]).payload
+
+    def test_login_route_updates_password_hash_to_preferred_hasher(self):
+        """
+        GIVEN an existing user whose password was hashed by another hasher than the preferred one
+        WHEN the login endpoint is posted to (POST) with the password verified in the verification pool
+        THEN checks that response is 200 and the password hash is updated to the preferred hasher
+        """
+        hashers = [
+            "accounts.hashers.ScryptPasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+        with self.settings(PASSWORD_HASHERS=hashers, PASSWORD_VERIFICATION_WORKERS=2):
+            data = {"email": "testloginuser@email.com", "password": "123456789!"}
+            response = self.client.post(self.url, data=data)
+            self.assertEqual(response.status_code, 200)
+            user = CustomUser.objects.get(email="testloginuser@email.com")
+            assert user.password.startswith("scrypt$")
+            assert user.check_password("123456789!")
+
+            data["password"] = "wrongpassword"
+            response = self.client.post(self.url, data=data)
+            self.assertEqual(response.status_code, 401)
+
     def test_login_route_failed_with_bad_request(self):
         """
         GIVEN wrong user data for login
@@ -87,6 +138,31 @@ class TestLogout:
         response = api_client.post(reverse("logout"), headers=headers)
         assert response.status_code == status.HTTP_205_RESET_CONTENT
 
+    def test_logout_route_blacklists_only_valid_tokens_in_bulk(
+        self, api_client, employees_users_with_tokens, django_assert_max_num_queries
+    ):
+        """
+        GIVEN a fixture for management employees with valid, expired and already blacklisted refresh tokens
+        WHEN the logout endpoint is posted to (POST)
+        THEN checks that response is 205, the valid tokens are blacklisted and the queries are constant
+        """
+        user = employees_users_with_tokens["management_employee"].user
+        for _ in range(20):
+            RefreshToken.for_user(user)
+        blacklisted_token = RefreshToken.for_user(user)
+        blacklisted_token.blacklist()
+        expired_token = RefreshToken.for_user(user)
+        OutstandingToken.objects.filter(jti=expired_token["jti"]).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        headers = {"Authorization": f"Bearer {user.access_token}"}
+
+        with django_assert_max_num_queries(5):
+            response = api_client.post(reverse("logout"), headers=headers)
+        assert response.status_code == status.HTTP_205_RESET_CONTENT
+        assert BlacklistedToken.objects.filter(token__user=user).count() == 22
+        assert not BlacklistedToken.objects.filter(token__jti=expired_token["jti"]).exists()
+
     def test_logout_route_unauthorized(self, api_client):
         """
         GIVEN an invalid acces token
@@ -174,3 +250,127 @@ class TestTokenRefresh:
         response = api_client.get(reverse("token_refresh"), data=data)
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
         assert "Méthode «\xa0GET\xa0» non autorisée." in response.data["detail"]
+
+
+class TestPruneExpiredTokens:
+    """
+    GIVEN fixture for employees with their associated users and tokens
+    WHEN the expired tokens are pruned
+    THEN checks that only the expired outstanding and blacklisted tokens are deleted
+    """
+
+    def test_prune_expired_tokens_command(self, employees_users_with_tokens):
+        """
+        GIVEN a fixture for employees with valid tokens, expired and expired blacklisted tokens
+        WHEN the prune_expired_tokens command is called
+        THEN checks that the expired tokens are deleted
+        """
+        user = employees_users_with_tokens["management_employee"].user
+        expired_tokens = [RefreshToken.for_user(user) for _ in range(3)]
+        expired_tokens[0].blacklist()
+        OutstandingToken.objects.filter(
+            jti__in=[token["jti"] for token in expired_tokens]
+        ).update(expires_at=timezone.now() - timedelta(days=1))
+        valid_tokens_count = OutstandingToken.objects.count() - 3
+
+        call_command("prune_expired_tokens", batch_size=2)
+        assert OutstandingToken.objects.count() == valid_tokens_count
+        assert not OutstandingToken.objects.filter(expires_at__lte=timezone.now()).exists()
+        assert BlacklistedToken.objects.count() == 0
+
+
+class TestCachedJWTAuthentication:
+    """
+    GIVEN fixture for employees with their associated users and tokens
+    WHEN user sends authenticated requests
+    THEN checks that the user is cached and that the cache is invalidated on changes
+    """
+
+    def test_authenticated_user_is_cached(self, api_client, employees_users_with_tokens):
+        """
+        GIVEN a fixture for sales employee with valid token
+        WHEN the contracts endpoint is requested twice (GET)
+        THEN checks that the user is only queried by the first request with its employee and groups
+        """
+        user = employees_users_with_tokens["sales_employee"].user
+        headers = {"Authorization": f"Bearer {user.access_token}"}
+        url = reverse("contracts")
+        api_client.get(url, headers=headers)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('FROM "accounts_customuser"' in query["sql"] for query in queries)
+
+        request_user = response.renderer_context["request"].user
+        with CaptureQueriesContext(connection) as queries:
+            assert request_user.employee.department == "SALES"
+            assert [group.name for group in request_user.groups.all()] == ["sales"]
+        assert len(queries) == 0
+
+    def test_cached_user_is_invalidated_on_user_and_employee_changes(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for sales employee with valid token
+        WHEN the employee department and then the user is_active are changed between requests
+        THEN checks that the changes are seen by the next request
+        """
+        employee = employees_users_with_tokens["sales_employee"]
+        headers = {"Authorization": f"Bearer {employee.user.access_token}"}
+        url = reverse("contracts")
+        api_client.get(url, headers=headers)
+
+        employee.department = "SUPPORT"
+        employee.save()
+        response = api_client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        request_user = response.renderer_context["request"].user
+        assert request_user.employee.department == "SUPPORT"
+        assert [group.name for group in request_user.groups.all()] == ["support"]
+
+        employee.user.is_active = False
+        employee.user.save()
+        response = api_client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "user_inactive" in response.data["code"]
+
+
+class TestTokenClaims:
+    """
+    GIVEN fixture for employees with their associated users and access tokens embedding their claims
+    WHEN user sends requests checking permissions
+    THEN checks that the claims are trusted without querying the permissions
+    """
+
+    def test_permission_claims_are_trusted(self, api_client, employees_users_with_tokens):
+        """
+        GIVEN a fixture for sales employee with an access token embedding its claims
+        WHEN the clients endpoint is posted to (POST) and the employees endpoint is requested (GET)
+        THEN checks that the add_client and is_staff claims decide without querying the auth tables
+        """
+        user = employees_users_with_tokens["sales_employee"].user
+        access_token = ClaimsRefreshToken.for_user(user).access_token
+        assert access_token["department"] == "SALES"
+        assert "clients.add_client" in access_token["permissions"]
+        headers = {"Authorization": f"Bearer {access_token}"}
+        api_client.get(reverse("contracts"), headers=headers)  # Caches the authenticated user.
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(
+                reverse("clients"),
+                headers=headers,
+                data={
+                    "company_name": "TEST CLAIMS Entreprise",
+                    "siren": "452268192",
+                    "first_name": "TEST CLAIMS Prénom",
+                    "last_name": "TEST CLAIMS Nom",
+                    "email": "TESTCLAIMSclient@email.com",
+                    "phone_number": "+33600000000",
+                },
+                format="json",
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            response = api_client.get(reverse("employees"), headers=headers)
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not any('"auth_' in query["sql"] for query in queries)
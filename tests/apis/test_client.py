@@ -4,6 +4,7 @@ from django.urls import reverse
 
 from clients.models import Client
 from locations.models import Location
+from tests.factories import LocationFactory
 
 
 class TestGetClient:
@@ -43,6 +44,34 @@ class TestGetClient:
         assert "created_at" in response.data
         assert "updated_at" in response.data
 
+    def test_get_client_route_not_modified_with_etag_and_last_modified(
+        self, api_client, new_client
+    ):
+        """
+        GIVEN a fixture for client with its sales_contact valid token
+        WHEN the client endpoint is requested (GET) again with the validators of the response
+        THEN checks that response is 304 until a location is added to the client
+        """
+        access_token = new_client.sales_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        url = reverse("client_detail", kwargs={"client_id": new_client.client_id})
+        response = api_client.get(url, headers=headers)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        response = api_client.get(url, headers={**headers, "If-Modified-Since": last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        new_client.locations.add(LocationFactory.create())
+        response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert len(response.data["locations"]) == 1
+
     def test_get_client_route_failed_with_forbidden(
         self, api_client, new_client, employees_users_with_tokens
     ):
@@ -141,6 +170,31 @@ class TestPutClient:
         assert new_client.sales_contact.last_name in response.data["sales_contact"]
         assert response.data["created_at"] != response.data["updated_at"]
 
+    def test_put_client_informations_route_with_if_match(self, api_client, new_client):
+        """
+        GIVEN a fixture for client with its sales_contact valid token and valid client data
+        WHEN the client endpoint is updated to (PUT) with the If-Match ETag of the client
+        THEN checks that response is 200 with the ETag of the updated client
+        and that a second update with the former ETag is 412 and does not update the client
+        """
+        access_token = new_client.sales_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        url = reverse("client_detail", kwargs={"client_id": new_client.client_id})
+        etag = api_client.get(url, headers=headers).headers["ETag"]
+
+        response = api_client.put(
+            url, headers={**headers, "If-Match": etag}, data=self.valid_client_data, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert response.headers["ETag"] == api_client.get(url, headers=headers).headers["ETag"]
+
+        response = api_client.put(
+            url, headers={**headers, "If-Match": etag}, data={"company_name": "STALE"}, format="json"
+        )
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert Client.objects.get(client_id=new_client.client_id).company_name == "UPDATED Entreprise TEST"
+
     def test_put_client_informations_route_failed_with_bad_request(
         self, api_client, new_client
     ):
@@ -1,10 +1,12 @@
 import uuid
 from datetime import datetime
 from rest_framework import status
-from django.db import transaction
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from events.models import Event
+from tests.factories import LocationFactory
 
 
 class TestPostClientContractEvent:
@@ -264,6 +266,111 @@ class TestGetClientContractEvent:
         assert contract_id == uuid.UUID(response.data["contract"]["contract_id"])
         assert client_id == uuid.UUID(response.data["contract"]["client"]["client_id"])
 
+    def test_get_client_contract_event_route_queries_do_not_depend_on_related_objects(
+        self, api_client, new_event
+    ):
+        """
+        GIVEN a fixture for event with its support_contact valid token
+        WHEN the client_contract_event_detail endpoint is requested (GET) before and after adding locations
+        THEN checks that both responses run the same number of queries
+        """
+        access_token = new_event.support_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        url = reverse(
+            "client_contract_event_detail",
+            kwargs={
+                "client_id": new_event.contract.client.client_id,
+                "contract_id": new_event.contract.contract_id,
+                "event_id": new_event.event_id,
+            },
+        )
+        api_client.get(url, headers=headers)  # Caches the authenticated user.
+
+        with CaptureQueriesContext(connection) as queries_without_locations:
+            response = api_client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        new_event.locations.add(*LocationFactory.create_batch(3))
+        new_event.contract.client.locations.add(*LocationFactory.create_batch(3))
+
+        with CaptureQueriesContext(connection) as queries_with_locations:
+            response = api_client.get(url, headers=headers)
+        assert len(response.data["locations"]) == 3
+        assert len(response.data["contract"]["client"]["locations"]) == 3
+        assert len(queries_without_locations) == len(queries_with_locations)
+
+    def test_get_client_contract_event_route_success_with_sparse_fields(
+        self, api_client, new_event
+    ):
+        """
+        GIVEN a fixture for event with its support_contact valid token
+        WHEN the client_contract_event_detail endpoint is requested (GET) with nested ?fields= and ?expand=
+        THEN checks that only the selected fields are displayed and the other columns are not loaded
+        """
+        access_token = new_event.support_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        url = reverse(
+            "client_contract_event_detail",
+            kwargs={
+                "client_id": new_event.contract.client.client_id,
+                "contract_id": new_event.contract.contract_id,
+                "event_id": new_event.event_id,
+            },
+        )
+        api_client.get(url, headers=headers)  # Caches the authenticated user.
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(
+                url,
+                {"fields": "event_id,start_date,contract.client.company_name,support_contact"},
+                headers=headers,
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            "event_id": str(new_event.event_id),
+            "start_date": response.data["start_date"],
+            "contract": {"client": {"company_name": new_event.contract.client.company_name}},
+            "support_contact": {"representation_str": str(new_event.support_contact)},
+        }
+        event_query = next(query["sql"] for query in queries if '"events_event"."start_date"' in query["sql"])
+        assert '"events_event"."event_name"' not in event_query
+        assert '"clients_client"."siren"' not in event_query
+        assert "locations" not in " ".join(query["sql"] for query in queries)
+
+        response = api_client.get(url, {"expand": "", "exclude": "notes"}, headers=headers)
+        assert response.json()["contract"] == str(new_event.contract.contract_id)
+        assert response.json()["support_contact"] == str(new_event.support_contact.employee_id)
+        assert "notes" not in response.json()
+        assert "event_name" in response.json()
+
+    def test_get_client_contract_event_route_success_with_sparse_fields_without_support_contact(
+        self, api_client, new_event
+    ):
+        """
+        GIVEN a fixture for event with its support_contact valid token
+        WHEN the client_contract_event_detail endpoint is requested (GET) with ?fields= leaving out support_contact
+        THEN checks that response is 200 and only the selected fields are displayed
+        """
+        access_token = new_event.support_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        url = reverse(
+            "client_contract_event_detail",
+            kwargs={
+                "client_id": new_event.contract.client.client_id,
+                "contract_id": new_event.contract.contract_id,
+                "event_id": new_event.event_id,
+            },
+        )
+        for query_params in (
+            {"fields": "contract.client.locations"},
+            {"fields": "event_id", "expand": "contract"},
+            {"fields": "locations.city"},
+        ):
+            response = api_client.get(url, query_params, headers=headers)
+            assert response.status_code == status.HTTP_200_OK
+            assert "support_contact" not in response.data
+        assert response.data == {"locations": []}
+
     def test_get_client_contract_event_route_failed_with_forbidden(
         self, api_client, new_event, employees_users_with_tokens
     ):
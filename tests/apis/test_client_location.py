@@ -41,6 +41,29 @@ class TestGetClientLocation:
         assert location.zip_code in response.data["zip_code"]
         assert location.country in response.data["country"]
 
+    def test_get_client_location_route_queries_client_once(
+        self, api_client, new_client_with_location, django_assert_num_queries
+    ):
+        """
+        GIVEN a fixture for client with location and its sales contact valid token
+        WHEN the client_location_detail endpoint is requested (GET)
+        THEN checks that the client with its sales contact and the location are queried once
+        and that the authenticated user is read from the cache
+        """
+        access_token = new_client_with_location.sales_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        client_id = new_client_with_location.client_id
+        location_id = new_client_with_location.locations.first().location_id
+        url = reverse(
+            "client_location_detail",
+            kwargs={"client_id": client_id, "location_id": location_id},
+        )
+        api_client.get(url, headers=headers)
+
+        with django_assert_num_queries(2):
+            response = api_client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
     def test_get_client_location_route_failed_with_forbidden(
         self, api_client, new_client_with_location, employees_users_with_tokens
     ):
@@ -205,6 +228,38 @@ class TestPutClientLocation:
             in response.data["country"]
         )
 
+    def test_put_client_location_route_failed_with_existing_address_bad_request(
+        self, api_client, new_client_with_location, new_location
+    ):
+        """
+        GIVEN fixtures for client with location, its sales contact valid token, and another location address
+        WHEN the client_location_detail endpoint is updated with the address of the other location (PUT)
+        THEN checks that response is 400 and error message is displayed
+        """
+        access_token = new_client_with_location.sales_contact.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        client_id = new_client_with_location.client_id
+        location_id = new_client_with_location.locations.first().location_id
+        existing_address = {
+            "street_number": new_location.street_number,
+            "street_name": new_location.street_name.upper(),
+            "city": new_location.city,
+            "zip_code": new_location.zip_code,
+            "country": new_location.country,
+        }
+        response = api_client.put(
+            reverse(
+                "client_location_detail",
+                kwargs={"client_id": client_id, "location_id": location_id},
+            ),
+            headers=headers,
+            data=existing_address,
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Location.objects.count() == 2
+        assert "Ce lieu existe déjà." in response.data["non_field_errors"]
+
     def test_put_client_location_route_failed_with_used_location_bad_request(
         self, api_client, new_client_with_location, new_client, new_location
     ):
@@ -1,5 +1,7 @@
 import uuid
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from locations.models import Location
@@ -176,6 +178,25 @@ class TestPostClientLocations:
         assert "02000" in response.data[1]["zip_code"]
         assert "ESPAGNE" in response.data[1]["country"]
 
+    def test_post_client_locations_route_updates_cached_count(
+        self, api_client, new_client
+    ):
+        """
+        GIVEN a fixture for client and its sales_contact valid token with valid locations data
+        WHEN the client_locations endpoint is requested (GET) with count=cached before and after a POST
+        THEN checks that the count and results of the locations added are displayed
+        """
+        access_token = new_client.sales_contact.user.access_token
+        url = reverse("client_locations", kwargs={"client_id": new_client.client_id})
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(url, {"count": "cached"}, headers=headers)
+        assert response.data["count"] == 0
+
+        api_client.post(url, headers=headers, data=self.locations_valid_data, format="json")
+        response = api_client.get(url, {"count": "cached"}, headers=headers)
+        assert response.data["count"] == 2
+        assert len(response.data["results"]) == 2
+
     def test_post_client_locations_route_with_existing_location_success(
         self, api_client, new_client, new_location
     ):
@@ -208,6 +229,90 @@ class TestPostClientLocations:
         assert Location.objects.count() == 1
         assert new_location.location_id == uuid.UUID(response.data[0]["location_id"])
 
+    def test_post_client_locations_route_with_near_duplicate_location_success(
+        self, api_client, new_client, new_location
+    ):
+        """
+        GIVEN fixtures for client and its sales_contact valid token, location,
+        and existing location data with a different casing and spaces
+        WHEN the client_locations endpoint is posted to (POST)
+        THEN checks that response is 201 and the existing location is added
+        """
+        near_duplicate_location_data = {
+            "locations": [
+                {
+                    "street_number": new_location.street_number,
+                    "street_name": f"  {new_location.street_name.upper()} ",
+                    "city": new_location.city.lower(),
+                    "zip_code": new_location.zip_code,
+                    "country": new_location.country.title(),
+                }
+            ]
+        }
+        access_token = new_client.sales_contact.user.access_token
+        client_id = new_client.client_id
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.post(
+            reverse("client_locations", kwargs={"client_id": client_id}),
+            headers=headers,
+            data=near_duplicate_location_data,
+            format="json",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Location.objects.count() == 1
+        assert new_location.location_id == uuid.UUID(response.data[0]["location_id"])
+        assert new_location.street_name == response.data[0]["street_name"]
+
+    def test_post_client_locations_route_queries_independent_of_locations_number(
+        self, api_client, new_client, new_location
+    ):
+        """
+        GIVEN a fixture for client and its sales_contact valid token, location, and existing and new locations data
+        WHEN the client_locations endpoint is posted to (POST) with one then many locations
+        THEN checks that the number of queries does not depend on the number of locations
+        """
+        existing_location = {
+            "street_number": new_location.street_number,
+            "street_name": new_location.street_name,
+            "city": new_location.city,
+            "zip_code": new_location.zip_code,
+            "country": new_location.country,
+        }
+        new_locations = [
+            {**self.location_2, "street_number": street_number}
+            for street_number in range(1, 21)
+        ]
+        access_token = new_client.sales_contact.user.access_token
+        client_id = new_client.client_id
+        headers = {"Authorization": f"Bearer {access_token}"}
+        api_client.get(
+            reverse("client_locations", kwargs={"client_id": client_id}), headers=headers
+        )  # Caches the authenticated user.
+
+        with CaptureQueriesContext(connection) as one_location_queries:
+            response = api_client.post(
+                reverse("client_locations", kwargs={"client_id": client_id}),
+                headers=headers,
+                data=self.location_valid_data,
+                format="json",
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        with CaptureQueriesContext(connection) as many_locations_queries:
+            response = api_client.post(
+                reverse("client_locations", kwargs={"client_id": client_id}),
+                headers=headers,
+                data={"locations": [existing_location, *new_locations, existing_location]},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 22
+        assert new_location.location_id == uuid.UUID(response.data[0]["location_id"])
+        assert response.data[0]["location_id"] == response.data[-1]["location_id"]
+        assert Location.objects.count() == 22
+        assert new_client.locations.count() == 22
+        assert len(one_location_queries) == len(many_locations_queries)
+
     def test_post_client_locations_route_failed_with_bad_request(
         self, api_client, new_client
     ):
@@ -1,4 +1,6 @@
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from clients.models import Client
@@ -65,6 +67,53 @@ class TestGetClients:
         assert 5 == response.data["count"]
         assert len(response.data["results"]) == 5
 
+    def test_get_clients_route_queries_do_not_depend_on_page_size(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for clients with distinct sales contacts and management employee with valid token
+        WHEN the clients endpoint is requested (GET) with a small and a large page size
+        THEN checks that both responses run the same number of queries
+        """
+        clients = ClientFactory.create_batch(10)  # noqa: F841
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        api_client.get(reverse("clients"), headers=headers)  # Caches the authenticated user.
+
+        with CaptureQueriesContext(connection) as small_page_queries:
+            response = api_client.get(
+                reverse("clients"), {"limit": 2, "count": "exact"}, headers=headers
+            )
+        assert len(response.data["results"]) == 2
+
+        with CaptureQueriesContext(connection) as large_page_queries:
+            response = api_client.get(
+                reverse("clients"), {"limit": 10, "count": "exact"}, headers=headers
+            )
+        assert len(response.data["results"]) == 10
+        assert len(small_page_queries) == len(large_page_queries)
+
+    def test_get_clients_route_success_with_search(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for clients and sales employee with valid token
+        WHEN the clients endpoint is requested (GET) with a search term
+        THEN checks that response is 200 and only matching clients are displayed
+        """
+        ClientFactory.create(company_name="Entreprise Dupont")
+        ClientFactory.create(company_name="Entreprise Durand")
+        access_token = employees_users_with_tokens["sales_employee"].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(
+            reverse("clients"), {"search": "dupont"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+        assert response.data["results"][0]["company_name"] == "Entreprise Dupont"
+
     def test_get_clients_route_failed_with_unauthorized(
         self, api_client, employees_users_with_tokens
     ):
@@ -1,4 +1,9 @@
+from io import StringIO
+
 from rest_framework import status
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from contracts.models import Contract
@@ -63,6 +68,178 @@ class TestGetContracts:
         assert 5 == response.data["count"]
         assert len(response.data["results"]) == 5
 
+    def test_get_contracts_route_success_with_client_labels_computed_by_the_database(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for contracts and management employee with valid token
+        WHEN the contracts endpoint is requested (GET)
+        THEN checks that the client labels are the clients __str__ selected by the contracts query
+        """
+        contracts = ContractFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        # Caches the authenticated user, not the contracts list response.
+        api_client.get(reverse("events"), headers=headers)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("contracts"), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert {contract["client"]["representation_str"] for contract in response.data["results"]} == {
+            str(contract.client) for contract in contracts
+        }
+        contracts_query = next(
+            query["sql"] for query in queries if '"contracts_contract"."amount"' in query["sql"]
+        )
+        assert "JOIN" in contracts_query and "client_str" in contracts_query
+        assert '"clients_client"."siren"' not in contracts_query
+        assert not any('FROM "clients_client"' in query["sql"] for query in queries)
+
+    def test_get_contracts_route_success_with_cursor_pagination(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for contracts and management employee with valid token
+        WHEN the contracts endpoint is requested (GET) in cursor pagination mode following next and previous links
+        THEN checks that pages are complete, ordered by newest first, without count and can be browsed back
+        """
+        contracts = ContractFactory.create_batch(5)  # noqa: F841
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(
+            reverse("contracts"), {"pagination": "cursor", "limit": 2}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert response.data["previous"] is None
+
+        pages = [response.data["results"]]
+        while response.data["next"]:
+            response = api_client.get(response.data["next"], headers=headers)
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.data["results"])
+        assert [len(page) for page in pages] == [2, 2, 1]
+
+        expected_ids = [
+            str(contract_id)
+            for contract_id in Contract.objects.order_by(
+                "-created_at", "-contract_id"
+            ).values_list("contract_id", flat=True)
+        ]
+        assert [
+            contract["contract_id"] for page in pages for contract in page
+        ] == expected_ids
+
+        response = api_client.get(response.data["previous"], headers=headers)
+        assert response.data["results"] == pages[1]
+
+    def test_get_contracts_route_failed_with_invalid_cursor(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for management employee with valid token
+        WHEN the contracts endpoint is requested (GET) with an invalid cursor
+        THEN checks that response is 404
+        """
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(
+            reverse("contracts"),
+            {"pagination": "cursor", "cursor": "INVALID"},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_contracts_route_success_without_count(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for contracts and management employee with valid token
+        WHEN the contracts endpoint is requested (GET) with count=none
+        THEN checks that count is omitted and next link is given while there are more contracts
+        """
+        contracts = ContractFactory.create_batch(3)  # noqa: F841
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(
+            reverse("contracts"), {"count": "none", "limit": 2}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert len(response.data["results"]) == 2
+
+        response = api_client.get(response.data["next"], headers=headers)
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
+
+    def test_get_contracts_route_cached_count_is_invalidated_by_save(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for contracts and management employee with valid token
+        WHEN the contracts endpoint is requested (GET) with count=cached before and after a contract is signed
+        THEN checks that the cached count of signed contracts is updated
+        """
+        contracts = ContractFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        query_params = {"count": "cached", "is_signed": True}
+        response = api_client.get(reverse("contracts"), query_params, headers=headers)
+        assert response.data["count"] == 0
+
+        contracts[0].is_signed = True
+        contracts[0].save()
+        response = api_client.get(reverse("contracts"), query_params, headers=headers)
+        assert response.data["count"] == 1
+        assert len(response.data["results"]) == 1
+
+    def test_get_contracts_route_response_cached_until_a_client_is_saved(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for contracts and management employee with valid token
+        WHEN the contracts endpoint is requested (GET) several times, with a client saved in between
+        THEN checks that the response and its conditional requests are served from the cache without query
+        until the client is saved and that the cache hits and misses are counted
+        """
+        contracts = ContractFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(reverse("contracts"), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        with CaptureQueriesContext(connection) as queries:
+            cached_response = api_client.get(reverse("contracts"), headers=headers)
+            not_modified_response = api_client.get(
+                reverse("contracts"), headers={**headers, "If-None-Match": response.headers["ETag"]}
+            )
+        assert len(queries) == 0
+        assert cached_response.data == response.data
+        assert cached_response.headers["ETag"] == response.headers["ETag"]
+        assert not_modified_response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client = contracts[0].client
+        client.company_name = "Société renommée"
+        client.save()
+        response = api_client.get(reverse("contracts"), headers=headers)
+        assert str(client) in {contract["client"]["representation_str"] for contract in response.data["results"]}
+
+        stdout = StringIO()
+        call_command("list_response_cache_stats", "--reset", stdout=stdout)
+        assert "ContractListAPIView: 2 hits, 2 misses, hit ratio 50.0%" in stdout.getvalue()
+
     def test_get_contracts_route_failed_with_unauthorized(
         self, api_client, employees_users_with_tokens
     ):
@@ -45,6 +45,31 @@ class TestGetEmployee:
         assert "date_joined" in response.data["user"]
         assert response.data["created_at"] == response.data["updated_at"]
 
+    def test_get_employee_route_not_modified_until_the_user_changes(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for management employee with valid token and a valid sales employee_id
+        WHEN the employee endpoint is requested (GET) again with the ETag of the response
+        THEN checks that response is 304 until the employee user email is modified
+        """
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        employee_to_get = employees_users_with_tokens["sales_employee"]
+        url = reverse("employee_detail", kwargs={"employee_id": employee_to_get.employee_id})
+        etag = api_client.get(url, headers=headers).headers["ETag"]
+        response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        user = CustomUser.objects.get(pk=employee_to_get.user_id)
+        user.email = "renamed@email.com"
+        user.save()
+        response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["user"]["email"] == "renamed@email.com"
+
     def test_get_employee_route_failed_with_forbidden(
         self, api_client, employees_users_with_tokens
     ):
@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from django.urls import reverse
 
@@ -31,6 +33,35 @@ class TestGetEmployees:
         assert 3 == response.data["count"]
         assert len(response.data["results"]) == 3
 
+    def test_get_employees_route_not_modified_until_a_user_changes(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for management employee with valid token
+        WHEN the employees endpoint is requested (GET) again with the ETag of the response
+        THEN checks that no aggregate query is run and response is 304 until a user email is modified
+        """
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("employees"), {"count": "none"}, headers=headers)
+        assert not any("MAX(" in query["sql"] or "COUNT(" in query["sql"] for query in queries)
+        etag = response.headers["ETag"]
+        response = api_client.get(
+            reverse("employees"), {"count": "none"}, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        user = employees_users_with_tokens["sales_employee"].user
+        user.email = "renamed@email.com"
+        user.save()
+        response = api_client.get(
+            reverse("employees"), {"count": "none"}, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
     def test_get_employees_route_failed_with_forbidden(
         self, api_client, employees_users_with_tokens
     ):
@@ -193,3 +224,128 @@ class TestPostEmployees:
         assert Employee.objects.count() == 3
         assert CustomUser.objects.count() == 3
         assert "token_not_valid" in response.data["code"]
+
+
+class TestBulkPostEmployees:
+    """
+    GIVEN a fixture for employees with their associated users and tokens, valid and invalid employees lists
+    WHEN user tries to create several employees with their associated users
+    THEN checks that the response is valid and data are displayed
+    """
+
+    valid_data = {
+        "employees": [
+            {
+                "employee_number": str(900000 + number),
+                "first_name": "Prénom de test",
+                "last_name": "Nom de test",
+                "department": department,
+                "user": {
+                    "email": f"testbulkemployee{number}@EMAIL.com",
+                    "password": "123456789!",
+                    "password2": "123456789!",
+                },
+            }
+            for number, department in enumerate(["MANAGEMENT", "SALES", "SUPPORT", "SALES"])
+        ]
+    }
+
+    def test_post_employees_bulk_route_success(
+        self, api_client, employees_users_with_tokens, settings
+    ):
+        """
+        GIVEN a fixture for management employee with valid token and valid data
+        WHEN the employees bulk endpoint is posted to (POST) with passwords hashed by two processes
+        THEN checks that response is 201, employees are created with their groups and can log in
+        """
+        settings.PASSWORD_HASHING_WORKERS = 2
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.post(
+            reverse("employees_bulk"), headers=headers, data=self.valid_data, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Employee.objects.count() == 7
+        assert CustomUser.objects.count() == 7
+        assert len(response.data) == 4
+        assert response.data[0]["user"]["email"] == "testbulkemployee0@email.com"
+        assert response.data[0]["user"]["is_staff"] is True
+        assert response.data[1]["user"]["is_staff"] is False
+        for employee in Employee.objects.filter(employee_number__gte=900000).select_related("user"):
+            assert list(employee.user.groups.values_list("name", flat=True)) == [
+                employee.department.lower()
+            ]
+            assert employee.user.check_password("123456789!")
+
+    def test_post_employees_bulk_route_failed_with_bad_request(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for management employee with valid token and rows with duplicated or existing unique fields
+        WHEN the employees bulk endpoint is posted to (POST)
+        THEN checks that response is 400, no employee is created and errors are indexed by row
+        """
+        management_employee = employees_users_with_tokens["management_employee"]
+        rows = [dict(row, user=dict(row["user"])) for row in self.valid_data["employees"]]
+        rows[1]["employee_number"] = rows[0]["employee_number"]
+        rows[2]["user"]["email"] = management_employee.user.email
+        rows[3]["first_name"] = "Prénom/ de test"
+        access_token = management_employee.user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.post(
+            reverse("employees_bulk"), headers=headers, data={"employees": rows}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Employee.objects.count() == 3
+        assert CustomUser.objects.count() == 3
+        assert (
+            "La saisie doit comporter uniquement des caractères alphabétiques avec apostrophe, tiret et espace."
+            in response.data[3]["first_name"]
+        )
+
+        rows[3]["first_name"] = "Prénom de test"
+        response = api_client.post(
+            reverse("employees_bulk"), headers=headers, data={"employees": rows}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Employee.objects.count() == 3
+        assert "Ce champ doit être unique." in response.data[0]["employee_number"]
+        assert "Ce champ doit être unique." in response.data[1]["employee_number"]
+        assert "Ce champ doit être unique." in response.data[2]["user"]["email"]
+        assert response.data[3] == {}
+
+    def test_post_employees_bulk_route_failed_with_list_body(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for management employee with valid token and the employees list as request body
+        WHEN the employees bulk endpoint is posted to (POST)
+        THEN checks that response is 400 and no employee is created
+        """
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.post(
+            reverse("employees_bulk"), headers=headers, data=self.valid_data["employees"], format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Employee.objects.count() == 3
+
+    def test_post_employees_bulk_route_failed_with_forbidden(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN a fixture for support employee with valid token and valid data
+        WHEN the employees bulk endpoint is posted to (POST)
+        THEN checks that response is 403 and no employee is created
+        """
+        access_token = employees_users_with_tokens["support_employee"].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.post(
+            reverse("employees_bulk"), headers=headers, data=self.valid_data, format="json"
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert Employee.objects.count() == 3
@@ -1,7 +1,14 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncClient
 from rest_framework import status
 from django.urls import reverse
 
 from events.models import Event
+from tests.factories import EventFactory
 
 
 class TestGetEvents:
@@ -74,3 +81,167 @@ class TestGetEvents:
         response = api_client.get(reverse("events"), headers=headers)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert "token_not_valid" in response.data["code"]
+
+    def test_get_events_route_not_modified_with_etag(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for events and management employee with valid token
+        WHEN the events endpoint is requested (GET) again with the ETag of the response
+        THEN checks that response is 304 until an event or a support contact label is modified
+        """
+        events = EventFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(reverse("events"), headers=headers)
+        etag = response.headers["ETag"]
+        assert "Last-Modified" in response.headers
+
+        response = api_client.get(reverse("events"), headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = api_client.get(
+            reverse("events"), {"limit": 1}, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        support_contact = events[0].support_contact
+        support_contact.last_name = "Renommé"
+        support_contact.save()
+        response = api_client.get(reverse("events"), headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+
+    def test_get_events_route_not_modified_when_ordered_by_start_date(
+        self, api_client, employees_users_with_tokens, settings
+    ):
+        """
+        GIVEN fixtures for events and management employee with valid token
+        WHEN the events endpoint is requested (GET) ordered by next start dates, again with the ETag of the response
+        THEN checks that response is 304 although the past dates filter depends on the request time
+        """
+        settings.LIST_RESPONSE_CACHE_TIMEOUT = 0  # The responses are not read from the cache.
+        EventFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        query_params = {"order_by": "start_date"}
+        response = api_client.get(reverse("events"), query_params, headers=headers)
+        etag = response.headers["ETag"]
+
+        response = api_client.get(
+            reverse("events"), query_params, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_get_events_route_cached_count_when_ordered_by_start_date(
+        self, api_client, employees_users_with_tokens, settings
+    ):
+        """
+        GIVEN fixtures for events and management employee with valid token
+        WHEN the events endpoint is requested (GET) twice ordered by next start dates with count=cached
+        THEN checks that the second count is read from the cache although the filter depends on the request time
+        """
+        settings.LIST_RESPONSE_CACHE_TIMEOUT = 0  # The responses are not read from the cache.
+        EventFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        query_params = {"order_by": "start_date", "count": "cached"}
+        response = api_client.get(reverse("events"), query_params, headers=headers)
+        assert response.data["count"] == 3
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("events"), query_params, headers=headers)
+        assert response.data["count"] == 3
+        assert not any("COUNT(" in query["sql"] for query in queries)
+
+    def test_get_events_route_success_with_cursor_pagination(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for events and management employee with valid token
+        WHEN the events endpoint is requested (GET) in cursor pagination mode following next links
+        THEN checks that all events are displayed once by start date
+        """
+        events = EventFactory.create_batch(5)  # noqa: F841
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(
+            reverse("events"), {"pagination": "cursor", "limit": 2}, headers=headers
+        )
+        results = response.data["results"]
+        while response.data["next"]:
+            response = api_client.get(response.data["next"], headers=headers)
+            results += response.data["results"]
+
+        expected_ids = [
+            str(event_id)
+            for event_id in Event.objects.order_by("start_date", "event_id").values_list(
+                "event_id", flat=True
+            )
+        ]
+        assert [event["event_id"] for event in results] == expected_ids
+
+    def test_get_events_route_success_with_concurrent_async_requests(
+        self, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for events and management employee with valid token
+        WHEN the events endpoint is requested (GET) concurrently through the ASGI client
+        THEN checks that responses are 200 with the offset and cursor pages displayed
+        """
+        EventFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        async_client = AsyncClient()
+
+        async def get_events():
+            return await asyncio.gather(
+                async_client.get(reverse("events"), {"limit": 2}, headers=headers),
+                async_client.get(
+                    reverse("events"), {"pagination": "cursor", "limit": 2}, headers=headers
+                ),
+            )
+
+        offset_response, cursor_response = async_to_sync(get_events)()
+        assert offset_response.status_code == status.HTTP_200_OK
+        assert offset_response.json()["count"] == 3
+        assert len(offset_response.json()["results"]) == 2
+        assert cursor_response.status_code == status.HTTP_200_OK
+        assert "count" not in cursor_response.json()
+        assert len(cursor_response.json()["results"]) == 2
+
+    def test_get_events_route_success_with_sparse_fields_and_cursor_pagination(
+        self, api_client, employees_users_with_tokens
+    ):
+        """
+        GIVEN fixtures for events and management employee with valid token
+        WHEN the events endpoint is requested (GET) with ?fields= in cursor pagination mode
+        THEN checks that only the selected fields are displayed on every page
+        """
+        EventFactory.create_batch(3)
+        access_token = employees_users_with_tokens[
+            "management_employee"
+        ].user.access_token
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = api_client.get(
+            reverse("events"),
+            {"fields": "event_id,end_date,is_event_over", "pagination": "cursor", "limit": 2},
+            headers=headers,
+        )
+        results = response.data["results"]
+        response = api_client.get(response.data["next"], headers=headers)
+        results += response.data["results"]
+
+        assert len(results) == 3
+        for event in results:
+            assert set(event) == {"event_id", "end_date", "is_event_over"}
+            assert event["is_event_over"] is False
@@ -0,0 +1,78 @@
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apis.parsers import ORJSONParser
+from apis.renderers import ORJSONRenderer
+from apis.serializers import ContractListSerializer, EventDetailSerializer
+from events.models import Event
+
+
+class TestORJSONRenderer:
+    """
+    GIVEN serialized data and native python values
+    WHEN they are rendered and parsed by the orjson renderer and parser
+    THEN checks that the output is the same as the DRF json one
+    """
+
+    def test_render_serializers_data_as_json_renderer(self, new_event_with_location):
+        """
+        GIVEN an event with its contract, client and locations
+        WHEN the EventDetailSerializer and ContractListSerializer data are rendered
+        THEN checks that both renderers output the same bytes
+        """
+        event = Event.objects.get(pk=new_event_with_location.pk)
+        for data in (
+            EventDetailSerializer(event).data,
+            ContractListSerializer([event.contract], many=True).data,
+        ):
+            assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_render_native_values_as_json_renderer(self):
+        """
+        GIVEN uuid, datetime, decimal, lazy string and javascript line separator values
+        WHEN they are rendered
+        THEN checks that both renderers output the same bytes
+        """
+        data = {
+            "uuid": uuid.uuid4(),
+            "datetime": timezone.now(),
+            "date": timezone.now().date(),
+            "decimal": Decimal("10.50"),
+            "lazy": _("This field is required."),
+            "text": "Événement\u2028au Château",
+            "list": [1, 2.5, None, True],
+        }
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_render_indented_for_browsable_api(self):
+        """
+        GIVEN data rendered with an indent, as by the browsable API
+        WHEN they are rendered
+        THEN checks that the output is indented as by the json renderer
+        """
+        data = {"results": [{"name": "Événement"}]}
+        context = {"indent": 4}
+        assert ORJSONRenderer().render(data, renderer_context=context) == JSONRenderer().render(
+            data, renderer_context=context
+        )
+
+    def test_parse_as_json_parser(self):
+        """
+        GIVEN a json request body and an invalid one
+        WHEN they are parsed
+        THEN checks that data are the ones of the json parser and errors are raised as ParseError
+        """
+        body = '{"company_name": "Château", "locations": [{"zip_code": "75001"}], "n": 1.5}'
+        assert ORJSONParser().parse(io.BytesIO(body.encode())) == JSONParser().parse(
+            io.BytesIO(body.encode())
+        )
+        with pytest.raises(ParseError, match="JSON parse error"):
+            ORJSONParser().parse(io.BytesIO(b'{"company_name": '))
@@ -0,0 +1,66 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import Employee
+from apis.serializers import (
+    ClientDetailSerializer,
+    ClientListSerializer,
+    ContractListSerializer,
+    EmployeeListSerializer,
+    EventListSerializer,
+    ValuesSerializer,
+)
+from clients.models import Client
+from contracts.models import Contract
+from events.models import Event
+from tests.factories import ClientFactory, EventFactory
+
+
+@pytest.mark.django_db
+class TestValuesSerializer:
+    """
+    GIVEN employees, clients, contracts and events with and without their contacts
+    WHEN their lists are serialized from values() rows
+    THEN checks that the output is the one of their list serializer
+    """
+
+    @pytest.mark.parametrize(
+        "serializer_class, model",
+        [
+            (EmployeeListSerializer, Employee),
+            (ClientListSerializer, Client),
+            (ContractListSerializer, Contract),
+            (EventListSerializer, Event),
+        ],
+    )
+    def test_values_serializer_output_is_serializer_output(self, serializer_class, model):
+        """
+        GIVEN rows with null and not null relations
+        WHEN they are serialized by the ValuesSerializer and by the list serializer
+        THEN checks that both outputs are rendered the same in one query
+        """
+        EventFactory.create_batch(2)
+        EventFactory.create(support_contact=None)
+        ClientFactory.create(sales_contact=None)
+        queryset = model.objects.order_by("pk")
+        values_serializer = ValuesSerializer(serializer_class)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = values_serializer.to_representation(values_serializer.get_values_queryset(queryset))
+        expected = serializer_class(serializer_class.setup_eager_loading(queryset), many=True).data
+
+        assert len(queries) == 1
+        assert len(data) == len(expected) > 0
+        assert JSONRenderer().render(data) == JSONRenderer().render(expected)
+
+    def test_values_serializer_rejects_to_many_relations(self):
+        """
+        GIVEN a serializer with a to-many relation
+        WHEN its ValuesSerializer is compiled
+        THEN checks that an ImproperlyConfigured error is raised
+        """
+        with pytest.raises(ImproperlyConfigured):
+            ValuesSerializer(ClientDetailSerializer).lookups
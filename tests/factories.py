@@ -54,7 +54,7 @@ class SalesContactFactory(factory.django.DjangoModelFactory):
         model = Employee
 
     employee_id = factory.LazyFunction(uuid4)
-    employee_number = factory.Sequence(lambda n: n + 100)
+    employee_number = factory.Sequence(lambda n: n + 100000)
     first_name = factory.LazyAttribute(lambda _: fake.first_name())
     last_name = factory.LazyAttribute(lambda _: fake.last_name())
     department = "SALES"
@@ -66,7 +66,7 @@ class SupportContactFactory(factory.django.DjangoModelFactory):
         model = Employee
 
     employee_id = factory.LazyFunction(uuid4)
-    employee_number = factory.Sequence(lambda n: n + 200)
+    employee_number = factory.Sequence(lambda n: n + 200000)
     first_name = factory.LazyAttribute(lambda _: fake.first_name())
     last_name = factory.LazyAttribute(lambda _: fake.last_name())
     department = "SUPPORT"
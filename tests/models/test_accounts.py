@@ -1,9 +1,13 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from faker import Faker
 
-from accounts.models import Employee
+from accounts.models import Employee, get_department_group_ids
+from accounts.permissions import DEFAULT_GROUP_PERMISSIONS, create_default_groups
 
 fake = Faker()
 CustomUser = get_user_model()
@@ -154,6 +158,34 @@ class TestEmployees:
                 user=new_employee.user,
             )
 
+    def test_save_employee_without_department_change_runs_no_extra_query(
+        self, new_employee, django_assert_num_queries
+    ):
+        """Tests if saving an employee without changing his department only runs its update query."""
+
+        employee = Employee.objects.get(pk=new_employee.pk)
+        employee.first_name = "Modifié"
+        with django_assert_num_queries(1):
+            employee.save()
+
+    def test_save_employee_with_department_change_updates_groups_and_staff(
+        self, employees_users_with_tokens
+    ):
+        """Tests if changing an employee department moves his user to the new group and updates is_staff."""
+
+        employee = Employee.objects.get(pk=employees_users_with_tokens["sales_employee"].pk)
+        employee.department = "MANAGEMENT"
+        employee.save()
+        user = CustomUser.objects.get(pk=employee.user_id)
+        assert [group.name for group in user.groups.all()] == ["management"]
+        assert user.is_staff
+
+        employee.department = "SUPPORT"
+        employee.save()
+        user = CustomUser.objects.get(pk=employee.user_id)
+        assert [group.name for group in user.groups.all()] == ["support"]
+        assert user.is_staff is False
+
     def test_delete_employee_and_his_user(self, new_employee):
         """Tests if employees deletion delete his linked user."""
 
@@ -162,3 +194,94 @@ class TestEmployees:
         new_employee.delete()
         assert Employee.objects.count() == 0
         assert CustomUser.objects.count() == 0
+
+    def test_department_group_ids_cache_expires(self, employees_users_with_tokens, settings):
+        """Tests if a change of the groups sending no signal is seen once the cache expired."""
+
+        settings.PERMISSIONS_CACHE_TIMEOUT = 0
+        sales_group_id = get_department_group_ids()["SALES"]
+
+        Group.objects.filter(pk=sales_group_id).update(name="former sales")
+        (new_sales_group,) = Group.objects.bulk_create([Group(name="sales")])
+        assert get_department_group_ids()["SALES"] == new_sales_group.pk
+
+
+class TestCachedPermissions:
+    """
+    GIVEN fixture for employees with their associated users
+    WHEN their permissions are checked
+    THEN checks that the groups permissions are cached and invalidated when they change
+    """
+
+    def test_has_perm_reads_cached_groups_permissions(self, employees_users_with_tokens):
+        """Tests if has_perm of users with prefetched groups does not query the groups permissions once cached."""
+
+        sales_user = employees_users_with_tokens["sales_employee"].user
+        assert sales_user.has_perm("clients.add_client")
+
+        users = CustomUser.objects.prefetch_related("groups").filter(employee__isnull=False)
+        users = {user.employee.department: user for user in users.select_related("employee")}
+        with CaptureQueriesContext(connection) as queries:
+            assert users["SALES"].has_perm("clients.add_client")
+            assert not users["SUPPORT"].has_perm("clients.add_client")
+            assert users["MANAGEMENT"].has_perm("accounts.add_employee")
+        assert not any("auth_group_permissions" in query["sql"] for query in queries)
+
+    def test_groups_permissions_change_invalidates_cache(self, employees_users_with_tokens):
+        """Tests if a change of a group permissions is seen by the next has_perm checks."""
+
+        assert CustomUser.objects.get(
+            pk=employees_users_with_tokens["sales_employee"].user.pk
+        ).has_perm("clients.add_client")
+
+        Group.objects.get(name="sales").permissions.remove(
+            Permission.objects.get(codename="add_client")
+        )
+        assert not CustomUser.objects.get(
+            pk=employees_users_with_tokens["sales_employee"].user.pk
+        ).has_perm("clients.add_client")
+
+    def test_groups_permissions_cache_expires(self, employees_users_with_tokens, settings):
+        """Tests if a change of a group permissions sending no signal is seen once the cache expired."""
+
+        settings.PERMISSIONS_CACHE_TIMEOUT = 0
+        user_id = employees_users_with_tokens["sales_employee"].user.pk
+        assert CustomUser.objects.get(pk=user_id).has_perm("clients.add_client")
+
+        Group.permissions.through.objects.filter(
+            group__name="sales", permission__codename="add_client"
+        ).delete()
+        assert not CustomUser.objects.get(pk=user_id).has_perm("clients.add_client")
+
+
+class TestDefaultGroups:
+    def test_create_default_groups_sets_the_permission_matrix(
+        self, db, django_assert_max_num_queries
+    ):
+        """Tests if create_default_groups with prune restores the permission matrix in constant queries."""
+
+        sales_group = Group.objects.get(name="sales")
+        sales_group.permissions.remove(Permission.objects.get(codename="add_client"))
+        sales_group.permissions.add(Permission.objects.get(codename="delete_employee"))
+        Group.objects.get(name="support").delete()
+
+        with django_assert_max_num_queries(8):
+            create_default_groups(prune=True)
+        for name, permissions in DEFAULT_GROUP_PERMISSIONS.items():
+            group_permissions = Group.objects.get(name=name).permissions.values_list(
+                "content_type__app_label", "codename"
+            )
+            assert {f"{app_label}.{codename}" for app_label, codename in group_permissions} == set(
+                permissions
+            )
+
+    def test_create_default_groups_keeps_granted_permissions(self, db):
+        """Tests if create_default_groups adds the missing permissions and keeps the granted ones."""
+
+        sales_group = Group.objects.get(name="sales")
+        sales_group.permissions.remove(Permission.objects.get(codename="add_client"))
+        sales_group.permissions.add(Permission.objects.get(codename="delete_employee"))
+
+        create_default_groups()
+        codenames = set(sales_group.permissions.values_list("codename", flat=True))
+        assert {"add_client", "delete_employee"} <= codenames
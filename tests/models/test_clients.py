@@ -1,5 +1,7 @@
 import pytest
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 
 from clients.models import Client
 from locations.models import Location
@@ -54,3 +56,23 @@ class TestClients:
         new_client_with_location.delete()
         assert Client.objects.count() == 0
         assert Location.objects.count() == 0
+
+    def test_delete_client_keeps_locations_in_use(
+        self, new_client_with_location, new_client, new_event, location_factory
+    ):
+        """Tests if client deletion only deletes the locations not used by other clients or events."""
+
+        shared_with_client, shared_with_event = location_factory.create_batch(2)
+        new_client_with_location.locations.add(shared_with_client, shared_with_event)
+        new_client.locations.add(shared_with_client)
+        new_event.locations.add(shared_with_event)
+
+        with CaptureQueriesContext(connection) as queries:
+            new_client_with_location.delete()
+        assert set(Location.objects.all()) == {shared_with_client, shared_with_event}
+
+        new_client.locations.add(*location_factory.create_batch(10))
+        with CaptureQueriesContext(connection) as many_locations_queries:
+            new_client.delete()
+        assert set(Location.objects.all()) == {shared_with_event}
+        assert len(queries) == len(many_locations_queries)
@@ -0,0 +1,48 @@
+from django.core.management import call_command
+
+from locations.models import Location
+
+
+class TestLocations:
+    """Tests location model."""
+
+    def test_delete_orphans(
+        self, new_client_with_location, new_event_with_location, location_factory
+    ):
+        """Tests if delete_orphans only deletes the locations used by no client and no event."""
+
+        orphans = location_factory.create_batch(5)
+        used_locations = {
+            new_client_with_location.locations.first(),
+            new_event_with_location.locations.first(),
+        }
+
+        assert set(Location.objects.orphans()) == set(orphans)
+        assert Location.objects.delete_orphans(batch_size=2) == 5
+        assert set(Location.objects.all()) == used_locations
+        assert Location.objects.delete_orphans() == 0
+
+    def test_fill_fingerprints_merges_duplicate_locations(self, new_client, new_event, location_factory):
+        """Tests if fill_fingerprints sets the missing fingerprints and merges the locations with the same address."""
+
+        location, duplicate, other = location_factory.create_batch(3)
+        Location.objects.filter(pk=duplicate.pk).update(
+            **{field: getattr(location, field) for field in Location.address_fields}
+        )
+        Location.objects.filter(pk__in=[duplicate.pk, other.pk]).update(fingerprint=None)
+        new_client.locations.add(location, duplicate)
+        new_event.locations.add(duplicate)
+
+        assert Location.objects.fill_fingerprints() == (1, 1)
+        assert set(Location.objects.all()) == {location, other}
+        assert list(new_client.locations.all()) == [location]
+        assert list(new_event.locations.all()) == [location]
+        other.refresh_from_db()
+        assert other.fingerprint == Location.get_fingerprint(other)
+
+    def test_loaddata_sets_the_fingerprints(self, db):
+        """Tests if the locations loaded from the sample data fixture get their fingerprint."""
+
+        call_command("loaddata", "fixtures/datas.json", verbosity=0)
+        for location in Location.objects.all():
+            assert location.fingerprint == Location.get_fingerprint(location)